@@ -0,0 +1,334 @@
+#!/usr/bin/env python
+#
+# Drives a `ParadoxAlarm` with a simulated stream of PAI property changes, entirely in-process, and reports:
+#  * change-to-port-read latency
+#  * change throughput, for zone chatter and arming storm bursts
+#  * cost of a full properties sweep
+#  * cost of port reads, and of update rounds reading all ports
+#  * memory per port
+#
+#     python benchmarks/change_stream.py [--zones 192] [--areas 8] [--remotes 16] [--changes 20000] [--budget-factor 1]
+#
+# The run fails (with exit code 1) when any measured value exceeds its budget (see `BUDGETS`), which is how the CI
+# workflow, running this on every push, gates changes. Budgets are loose enough for shared CI runners, so that only
+# actual regressions trip them; they are meant for the default arguments and can be scaled with `--budget-factor`.
+#
+# The panel is replaced by a fake `Paradox` whose (real) PAI memory storage publishes changes through PAI's pub/sub,
+# just like it does when fed by a panel. Reading ports into qToggleServer core is replaced by calling
+# `read_transformed_value()` on the ports being read, as core does.
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import tracemalloc
+
+from collections.abc import Callable
+from types import SimpleNamespace
+from typing import Any
+
+from paradox.data.memory_storage import MemoryStorage
+from qtoggleserver.core import main as core_main
+from qtoggleserver.core import ports as core_ports
+
+from qtoggleserver.paradox import ParadoxAlarm, constants, routing
+
+
+# Upper limits of measured values, in seconds unless noted otherwise; typical values are 5 to 20 times lower
+BUDGETS = {
+    "change-to-read latency median": 1e-3,
+    "change-to-read latency p99": 10e-3,
+    "zone chatter time per change": 500e-6,
+    "arming storm time per change": 500e-6,
+    "properties sweep": 10e-3,
+    "port read": 5e-6,
+    "update round": 50e-3,
+    "ports read per update round": 20,
+    "memory per port": 16 * 1024,  # bytes
+}
+
+
+class FakeConnection:
+    connected = True
+
+    def on_connection_loss(self) -> None:
+        self.connected = False
+
+
+class FakeParadox:
+    def __init__(self) -> None:
+        self.storage = MemoryStorage()
+        self.connection = FakeConnection()
+        self.panel = SimpleNamespace(
+            load_memory=self._succeed,
+            control_partitions=self._succeed,
+            control_zones=self._succeed,
+            control_outputs=self._succeed,
+        )
+        self.run_state = None
+        self._stopped = asyncio.Event()
+
+    @staticmethod
+    async def _succeed(*args, **kwargs) -> bool:
+        return True
+
+    async def connect(self) -> bool:
+        return True
+
+    async def disconnect(self) -> None:
+        self._stopped.set()
+
+    async def loop(self) -> None:
+        await self._stopped.wait()
+
+    def request_status_refresh(self) -> None:
+        pass
+
+
+class BenchmarkAlarm(ParadoxAlarm):
+    def make_paradox(self) -> FakeParadox:
+        paradox = FakeParadox()
+        routing.attach(self, paradox)
+        self.fake_paradox = paradox
+
+        return paradox
+
+
+class PortReader:
+    # Stands in for `core_main.read_ports()`, recording when ports are read
+
+    def __init__(self) -> None:
+        self.read_count: int = 0
+        self.ports_read_count: int = 0
+        self.waiters: dict[Any, asyncio.Future] = {}
+
+    async def read_ports(self, ports: list[Any]) -> None:
+        self.read_count += 1
+        self.ports_read_count += len(ports)
+        for port in ports:
+            await read_port(port)
+            waiter = self.waiters.pop(port, None)
+            if waiter and not waiter.done():
+                waiter.set_result(time.perf_counter())
+
+    def wait_read(self, port: Any) -> asyncio.Future:
+        future = self.waiters[port] = asyncio.get_running_loop().create_future()
+        return future
+
+    def reset(self) -> None:
+        self.read_count = 0
+        self.ports_read_count = 0
+
+
+async def read_port(port: Any) -> bool:
+    # Returns `False` if the read was skipped
+    try:
+        await port.read_transformed_value()
+    except core_ports.SkipRead:
+        return False
+
+    return True
+
+
+def is_open(storage: MemoryStorage, zone: int) -> bool:
+    # Looked up in storage rather than in the alarm, which only catches up once published changes are handled
+    return storage.data["zone"][f"zone_{zone}"]["open"]
+
+
+def format_time(seconds: float) -> str:
+    return f"{seconds * 1e6:.1f} us"
+
+
+async def make_alarm(args: argparse.Namespace) -> tuple[BenchmarkAlarm, dict[str, Any], float]:
+    remotes = list(range(1, args.remotes + 1))
+    alarm = BenchmarkAlarm(
+        params={},
+        name="bench",
+        zones=list(range(1, args.zones + 1)),
+        areas=list(range(1, args.areas + 1)),
+        remotes=remotes,
+        remote_buttons={remote: ["a", "b"] for remote in remotes},
+        change_batch_window=args.batch_window,
+    )
+
+    # Populate storage before the alarm connects, as a panel would during the initial status
+    await alarm.enable()
+    while alarm.get_connection_state() != constants.CONNECTION_STATE_RUNNING:
+        await asyncio.sleep(0.01)
+
+    storage = alarm.fake_paradox.storage
+    for zone in range(1, args.zones + 1):
+        storage.update_container_object(
+            "zone",
+            f"zone_{zone}",
+            {"id": zone, "key": f"zone_{zone}", "label": f"Zone {zone}", "open": False, "alarm": False},
+        )
+    for area in range(1, args.areas + 1):
+        storage.update_container_object(
+            "partition",
+            f"area_{area}",
+            {"id": area, "key": f"area_{area}", "label": f"Area {area}", "current_state": "disarmed", "alarm": False},
+        )
+    for remote in remotes:
+        storage.update_container_object(
+            "user", f"user_{remote}", {"id": remote, "key": f"user_{remote}", "label": f"User {remote}"}
+        )
+    await asyncio.sleep(0.1)
+
+    tracemalloc.start()
+    ports = {}
+    for port_args in await alarm.get_port_args():
+        port_args = dict(port_args)
+        driver = port_args.pop("driver")
+        port = driver(**port_args)
+        ports[port.get_initial_id()] = port
+    ports_size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"ports: {len(ports)}, memory per port: {ports_size / len(ports) / 1024:.2f} KiB")
+
+    return alarm, ports, ports_size / len(ports)
+
+
+async def measure_latency(
+    alarm: BenchmarkAlarm, ports: dict[str, Any], reader: PortReader, count: int
+) -> tuple[float, float]:
+    storage = alarm.fake_paradox.storage
+    zones = list(alarm.get_zones())
+    latencies = []
+    for _ in range(count):
+        zone = random.choice(zones)
+        future = reader.wait_read(ports[f"zone{zone}.open"])
+        start_time = time.perf_counter()
+        storage.update_container_object("zone", f"zone_{zone}", {"open": not is_open(storage, zone)})
+        latencies.append(await future - start_time)
+
+    latencies.sort()
+    median = statistics.median(latencies)
+    p99 = latencies[int(len(latencies) * 0.99)]
+    print(f"change-to-read latency: median {format_time(median)}, p99 {format_time(p99)}")
+
+    return median, p99
+
+
+async def measure_burst(
+    name: str, alarm: BenchmarkAlarm, ports: dict[str, Any], reader: PortReader, publish: Callable[[], int]
+) -> float:
+    # A sentinel change is published after the burst; as changes are handled in order, its read marks the end
+    storage = alarm.fake_paradox.storage
+    sentinel_port = ports["zone1.open"]
+
+    reader.reset()
+    start_time = time.perf_counter()
+    count = publish()
+    future = reader.wait_read(sentinel_port)
+    storage.update_container_object("zone", "zone_1", {"open": not is_open(storage, 1)})
+    await future
+    duration = time.perf_counter() - start_time
+
+    print(
+        f"{name}: {count} changes in {duration * 1000:.1f} ms ({count / duration:.0f} changes/s), "
+        f"{reader.read_count} port reads of {reader.ports_read_count} ports"
+    )
+
+    return duration / count
+
+
+async def run(args: argparse.Namespace) -> None:
+    reader = PortReader()
+    core_main.read_ports = reader.read_ports
+
+    results = {}
+    alarm, ports, results["memory per port"] = await make_alarm(args)
+    storage = alarm.fake_paradox.storage
+
+    latencies = await measure_latency(alarm, ports, reader, args.latency_samples)
+    results["change-to-read latency median"], results["change-to-read latency p99"] = latencies
+
+    def zone_chatter() -> int:
+        for _ in range(args.changes):
+            zone = random.randint(1, args.zones)
+            storage.update_container_object("zone", f"zone_{zone}", {"open": not is_open(storage, zone)})
+
+        return args.changes
+
+    def arming_storm() -> int:
+        count = 0
+        states = ["arming", "armed_away", "triggered", "disarmed"]
+        for i in range(args.changes // (args.areas * 2)):
+            state = states[i % len(states)]
+            for area in range(1, args.areas + 1):
+                storage.update_container_object(
+                    "partition", f"area_{area}", {"current_state": state, "alarm": state == "triggered"}
+                )
+                count += 2
+
+        return count
+
+    results["zone chatter time per change"] = await measure_burst("zone chatter", alarm, ports, reader, zone_chatter)
+    results["arming storm time per change"] = await measure_burst("arming storm", alarm, ports, reader, arming_storm)
+
+    start_time = time.perf_counter()
+    for _ in range(args.sweeps):
+        await alarm._sweep_properties()
+    results["properties sweep"] = (time.perf_counter() - start_time) / args.sweeps
+    print(f"properties sweep: {results['properties sweep'] * 1000:.2f} ms")
+
+    port_list = list(ports.values())
+    start_time = time.perf_counter()
+    for _ in range(args.reads):
+        for port in port_list:
+            await port.read_value()
+    results["port read"] = (time.perf_counter() - start_time) / args.reads / len(port_list)
+    print(f"port read: {format_time(results['port read'])}")
+
+    # Like qToggleServer core's update loop, with a zone changing between rounds
+    read_count = 0
+    start_time = time.perf_counter()
+    for _ in range(args.reads):
+        zone = random.randint(1, args.zones)
+        storage.update_container_object("zone", f"zone_{zone}", {"open": not is_open(storage, zone)})
+        await asyncio.sleep(0)
+        for port in port_list:
+            read_count += await read_port(port)
+    results["update round"] = (time.perf_counter() - start_time) / args.reads
+    results["ports read per update round"] = read_count / args.reads
+    print(
+        f"update round: {format_time(results['update round'])}, "
+        f"{results['ports read per update round']:.1f} of {len(port_list)} ports read"
+    )
+
+    await alarm.handle_cleanup()
+
+    if args.budget_factor:
+        exceeded = False
+        for name, budget in BUDGETS.items():
+            if results[name] > budget * args.budget_factor:
+                print(f"budget exceeded: {name}: {results[name]:g} > {budget * args.budget_factor:g}")
+                exceeded = True
+
+        if exceeded:
+            raise SystemExit(1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--zones", type=int, default=192)
+    parser.add_argument("--areas", type=int, default=8)
+    parser.add_argument("--remotes", type=int, default=16)
+    parser.add_argument("--changes", type=int, default=20000)
+    parser.add_argument("--latency-samples", type=int, default=1000)
+    parser.add_argument("--sweeps", type=int, default=100)
+    parser.add_argument("--reads", type=int, default=100)
+    parser.add_argument("--batch-window", type=int, default=0, help="change batch window, in milliseconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--budget-factor", type=float, default=1, help="scales all budgets (0 disables them)")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python
+#
+# Connects `ParadoxAlarm`s to emulated panels (see `panel_emulator.py`) and reports, end to end:
+#  * connect time
+#  * recovery time after the panel drops the connection
+#  * live event latency, from the panel to alarm properties
+#  * round trip of `set_*` commands
+#
+#     python benchmarks/end_to_end.py [--panels 4] [--transport ip|serial] [--latency 10] [--loss 0.01]
+#
+# Each alarm gets its own emulated panel, while all of them run in one process.
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from collections.abc import Awaitable, Callable
+
+from panel_emulator import PanelEmulator
+
+from qtoggleserver.paradox import ParadoxAlarm, constants
+
+
+def format_times(times: list[float]) -> str:
+    times = sorted(times)
+
+    return (
+        f"median {statistics.median(times) * 1000:.1f} ms, "
+        f"p90 {times[int(len(times) * 0.9)] * 1000:.1f} ms, "
+        f"max {times[-1] * 1000:.1f} ms"
+    )
+
+
+async def wait_until(condition: Callable[[], bool], timeout: float) -> float:
+    start_time = time.perf_counter()
+    while not condition():
+        if time.perf_counter() - start_time > timeout:
+            raise TimeoutError()
+        await asyncio.sleep(0.001)
+
+    return time.perf_counter() - start_time
+
+
+def is_running(alarm: ParadoxAlarm) -> bool:
+    return alarm.get_connection_state() == constants.CONNECTION_STATE_RUNNING
+
+
+async def make_panel(args: argparse.Namespace, index: int) -> tuple[PanelEmulator, ParadoxAlarm]:
+    emulator = PanelEmulator(zones=args.zones, areas=args.areas, outputs=args.outputs, latency=args.latency)
+    if args.transport == "ip":
+        connection_params = {"ip_host": "127.0.0.1", "ip_port": await emulator.start_tcp()}
+    else:
+        connection_params = {"serial_port": emulator.start_pty()}
+
+    alarm = ParadoxAlarm(
+        params={},
+        name=f"panel{index}",
+        zones=list(emulator.zones),
+        areas=list(emulator.areas),
+        outputs=list(emulator.outputs),
+        reconnect_min_delay=args.reconnect_delay,
+        **connection_params,
+    )
+
+    return emulator, alarm
+
+
+async def measure_connect(panels: list[tuple[PanelEmulator, ParadoxAlarm]], timeout: float) -> None:
+    for _, alarm in panels:
+        await alarm.enable()
+
+    times = await asyncio.gather(*(wait_until(lambda a=alarm: is_running(a), timeout) for _, alarm in panels))
+    print(f"connect: {format_times(times)}")
+
+
+async def measure_recovery(panels: list[tuple[PanelEmulator, ParadoxAlarm]], rounds: int, timeout: float) -> None:
+    async def recover(emulator: PanelEmulator, alarm: ParadoxAlarm) -> float:
+        start_time = time.perf_counter()
+        emulator.drop_connections()
+        await wait_until(lambda: not is_running(alarm), timeout)
+        await wait_until(lambda: is_running(alarm), timeout)
+
+        return time.perf_counter() - start_time
+
+    times = []
+    for _ in range(rounds):
+        times += await asyncio.gather(*(recover(emulator, alarm) for emulator, alarm in panels))
+    print(f"recovery: {format_times(times)}")
+
+
+async def measure_events(panels: list[tuple[PanelEmulator, ParadoxAlarm]], count: int, timeout: float) -> None:
+    async def toggle_zone(emulator: PanelEmulator, alarm: ParadoxAlarm) -> float:
+        zone = random.choice(list(emulator.zones))
+        open_ = not emulator.zones[zone].open
+        emulator.set_zone_open(zone, open_)
+
+        return await wait_until(lambda: alarm.get_property("zone", zone, "open") == open_, timeout)
+
+    times = []
+    for _ in range(count):
+        times += await asyncio.gather(*(toggle_zone(emulator, alarm) for emulator, alarm in panels))
+    print(f"zone event: {format_times(times)}")
+
+
+async def measure_command(
+    name: str,
+    panels: list[tuple[PanelEmulator, ParadoxAlarm]],
+    count: int,
+    command: Callable[[ParadoxAlarm, int], Awaitable[None]],
+) -> None:
+    async def run_command(alarm: ParadoxAlarm, i: int) -> float:
+        start_time = time.perf_counter()
+        await command(alarm, i)
+
+        return time.perf_counter() - start_time
+
+    times = []
+    for i in range(count):
+        times += await asyncio.gather(*(run_command(alarm, i) for _, alarm in panels))
+    print(f"{name}: {format_times(times)}")
+
+
+async def run(args: argparse.Namespace) -> None:
+    panels = [await make_panel(args, i) for i in range(args.panels)]
+
+    await measure_connect(panels, args.timeout)
+
+    for emulator, _ in panels:
+        emulator.loss = args.loss
+
+    await measure_events(panels, args.events, args.timeout)
+
+    armed_modes = [constants.ARMED_MODE_ARMED, constants.ARMED_MODE_DISARMED]
+    await measure_command(
+        "set_area_armed_mode",
+        panels,
+        args.commands,
+        lambda alarm, i: alarm.set_area_armed_mode(1, armed_modes[i % 2]),
+    )
+    await measure_command(
+        "set_zone_bypass", panels, args.commands, lambda alarm, i: alarm.set_zone_bypass(1, i % 2 == 0)
+    )
+    output_actions = [constants.PGM_ACTION_ON, constants.PGM_ACTION_OFF]
+    await measure_command(
+        "set_output_action",
+        panels,
+        args.commands,
+        lambda alarm, i: alarm.set_output_action(1, output_actions[i % 2]),
+    )
+
+    if args.transport == "ip":  # a serial line can't be dropped
+        await measure_recovery(panels, args.recoveries, args.timeout)
+
+    for emulator, alarm in panels:
+        await alarm.handle_cleanup()
+        await emulator.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--panels", type=int, default=4)
+    parser.add_argument("--transport", choices=["ip", "serial"], default="ip")
+    parser.add_argument("--zones", type=int, default=32)
+    parser.add_argument("--areas", type=int, default=2)
+    parser.add_argument("--outputs", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0, help="panel reply latency, in milliseconds")
+    parser.add_argument("--loss", type=float, default=0, help="probability of dropping a panel frame, once connected")
+    parser.add_argument("--events", type=int, default=50)
+    parser.add_argument("--commands", type=int, default=20)
+    parser.add_argument("--recoveries", type=int, default=5)
+    parser.add_argument("--reconnect-delay", type=int, default=constants.DEFAULT_RECONNECT_MIN_DELAY)
+    parser.add_argument("--timeout", type=float, default=60, help="timeout of each measurement, in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
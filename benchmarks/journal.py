@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+#
+# Fills a `Journal` well past both its record ring and its string table, with a mix of changes like those of a running
+# panel (zone chatter, partition state changes, troubles with long string values, the panel clock), and reports:
+#  * append time per change
+#  * query time, for a single entity property and for the whole journal
+#
+#     python benchmarks/journal.py [--size 64] [--changes 200000] [--budget-factor 1]
+#
+# The run fails (with exit code 1) when changes recorded after the string table has been cycled through many times
+# no longer decode to the values they were appended with, or when any measured value exceeds its budget. Budgets are
+# meant for the default arguments and can be scaled with `--budget-factor`.
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from qtoggleserver.paradox.journal import UNKNOWN, Journal
+
+
+# Upper limits of measured values, in seconds
+BUDGETS = {
+    "append": 20e-6,
+    "property query": 5e-3,
+    "full query": 50e-3,
+}
+
+STATES = ["disarmed", "arming", "armed_away", "armed_stay", "triggered"]
+
+
+def format_time(value: float) -> str:
+    return f"{value * 1e6:.2f} us"
+
+
+def append_change(journal: Journal, i: int, zones: int) -> None:
+    match i % 8:
+        case 0:
+            # Unique long strings, each taking a string table entry
+            journal.append("system", None, "trouble_message", None, f"trouble number {i} reported by the panel")
+        case 1:
+            journal.append("system", None, "time", i - 60, i)
+        case 2 | 3:
+            old_state, new_state = random.sample(STATES, 2)
+            journal.append("partition", random.randint(1, 8), "current_state", old_state, new_state)
+        case _:
+            zone = random.randint(1, zones)
+            journal.append("zone", zone, "open", False, True)
+
+
+def check(journal: Journal, i: int) -> list[str]:
+    errors = []
+    journal.append("partition", 1, "current_state", "armed_away", "triggered")
+    journal.append("system", None, "trouble_message", f"trouble number {i} reported by the panel", None)
+    records = journal.query(limit=2)
+
+    expected = [
+        ("partition", 1, "current_state", "armed_away", "triggered"),
+        ("system", None, "trouble_message", f"trouble number {i} reported by the panel", None),
+    ]
+    for record, values in zip(records, expected, strict=True):
+        decoded = (record["type"], record["id"], record["property"], record["old_value"], record["new_value"])
+        if decoded != values:
+            errors.append(f"after {i} changes: expected {values}, got {decoded}")
+        if UNKNOWN in (record["old_value"], record["new_value"]):
+            errors.append(f"after {i} changes: unrecorded value in {decoded}")
+
+    return errors
+
+
+def run(args: argparse.Namespace) -> None:
+    results = {}
+    errors = []
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "journal")
+        journal = Journal(path, args.size * 1024)
+        print(f"journal capacity: {journal.get_capacity()} records")
+
+        start_time = time.perf_counter()
+        for i in range(args.changes):
+            append_change(journal, i, args.zones)
+        results["append"] = (time.perf_counter() - start_time) / args.changes
+        print(f"append: {format_time(results['append'])}")
+
+        errors += check(journal, args.changes)
+
+        if journal.query("system", None, "time"):
+            errors.append("panel clock changes were recorded")
+
+        start_time = time.perf_counter()
+        for _ in range(args.queries):
+            journal.query("partition", 1, "current_state")
+        results["property query"] = (time.perf_counter() - start_time) / args.queries
+        print(f"property query: {format_time(results['property query'])}")
+
+        start_time = time.perf_counter()
+        for _ in range(args.queries):
+            journal.query()
+        results["full query"] = (time.perf_counter() - start_time) / args.queries
+        print(f"full query: {results['full query'] * 1000:.2f} ms")
+
+        # Reference counts of string table entries are rebuilt when reopening
+        journal.close()
+        journal = Journal(path, args.size * 1024)
+        for i in range(args.changes, args.changes + journal.get_capacity() * 2):
+            append_change(journal, i, args.zones)
+        errors += check(journal, args.changes + journal.get_capacity() * 2)
+        journal.close()
+
+    for error in errors:
+        print(f"decoding error: {error}")
+
+    exceeded = False
+    if args.budget_factor:
+        for name, budget in BUDGETS.items():
+            if results[name] > budget * args.budget_factor:
+                print(f"budget exceeded: {name}: {results[name]:g} > {budget * args.budget_factor:g}")
+                exceeded = True
+
+    if errors or exceeded:
+        raise SystemExit(1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=64, help="journal size, in kilobytes")
+    parser.add_argument("--changes", type=int, default=200000)
+    parser.add_argument("--zones", type=int, default=192)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--budget-factor", type=float, default=1, help="scales all budgets (0 disables them)")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,680 @@
+#!/usr/bin/env python
+#
+# Emulates a Paradox Magellan MG5050 panel at the wire level, reachable:
+#  * over TCP, behind an emulated IP150 module (for `ip_host`/`ip_port`)
+#  * over a pseudo-terminal (for `serial_port`)
+#
+#     python benchmarks/panel_emulator.py [--tcp 127.0.0.1:10000] [--pty] [--zones 32] [--areas 2] [--outputs 16]
+#                                         [--latency 20] [--loss 0.01] [--baud 57600] [--noise 0.01] [--script FILE]
+#
+# Zone, area and PGM states can be changed through the `PanelEmulator` API or by a script of commands, one per line:
+#   open|close|alarm|restore|bypass <zone>
+#   arm|arm_stay|arm_sleep|disarm <area>
+#   pgm <output> on|off
+#   drop            drops all clients
+#   offline|online  stops/resumes answering clients
+#   wait <seconds>
+#
+# Only the protocol subset used by PAI is covered: connecting, loading labels and definitions, polling status, live zone
+# and area events, and controlling areas, zones and PGMs. Panel frames are subject to the injected latency and loss.
+# On the pseudo-terminal, data is garbled unless the client's baud rate matches the panel's, and panel frames are
+# subject to the injected noise.
+
+import argparse
+import asyncio
+import datetime
+import logging
+import os
+import random
+import termios
+import tty
+
+from collections.abc import Iterable
+
+from construct import Container
+from paradox.connections.ip.parsers import (
+    IPMessageCommand,
+    IPMessageRequest,
+    IPMessageResponse,
+    IPMessageType,
+    IPPayloadConnectResponse,
+)
+
+
+FRAME_SIZE = 37
+IP_HEADER_SIZE = 16
+
+PRODUCT_ID = 65  # MAGELLAN_MG5050
+FIRMWARE = (7, 50, 0)
+PANEL_ID = 0x1234
+SERIAL_NUMBER = b"\x05\x00\x12\x34"
+IP_MODULE_SERIAL = b"\x71\x00\x00\x01"  # 0x71 designates an IP150
+
+MAX_ZONES = 32
+MAX_AREAS = 2
+MAX_OUTPUTS = 16
+MAX_USERS = 32
+
+# EEPROM addresses
+ZONE_LABELS_ADDRESS = 0x010
+OUTPUT_LABELS_ADDRESS = 0x210
+AREA_LABELS_ADDRESS = 0x310
+USER_LABELS_ADDRESS = 0x330
+ZONE_DEFINITIONS_ADDRESS = 0x730
+OUTPUT_DEFINITIONS_ADDRESS = 0x7A0
+EEPROM_SIZE = 0x800
+RAM_ADDRESS = 0x8000
+
+# Live event major codes
+EVENT_ZONE_CLOSED = 0
+EVENT_ZONE_OPEN = 1
+EVENT_AREA_STATUS = 2
+EVENT_ZONE_BYPASS = 35
+EVENT_ZONE_ALARM = 36
+EVENT_ZONE_ALARM_RESTORE = 38
+
+# Area status event minor codes
+AREA_STATUS_AUDIBLE_ALARM = 3
+AREA_STATUS_ALARM_STOPPED = 7
+AREA_STATUS_DISARMED = 11
+AREA_STATUS_ARMED = 12
+
+# `PerformAction` actions
+ACTION_ARM_MODES = {0x01: "stay", 0x02: "stay", 0x03: "sleep", 0x04: "away", 0x06: "stay", 0x07: "sleep"}
+ACTION_DISARM = 0x05
+ACTION_DISARM_ALL = 0x08
+ACTION_BYPASS = 0x10
+ACTION_PGM_ON = (0x30, 0x32)
+ACTION_PGM_OFF = (0x31, 0x33)
+
+ERROR_INVALID_PC_PASSWORD = 0x12
+
+logger = logging.getLogger("panel_emulator")
+
+
+def make_frame(*head: int, data: bytes = b"") -> bytes:
+    body = bytes(head) + data
+    body += bytes(FRAME_SIZE - 1 - len(body))
+
+    return body + bytes([sum(body) % 256])
+
+
+def is_valid_frame(frame: bytes) -> bool:
+    return sum(frame[:-1]) % 256 == frame[-1]
+
+
+def encode_bits(flags: Iterable[bool], size: int) -> bytes:
+    data = bytearray(size)
+    for i, flag in enumerate(flags):
+        if flag:
+            data[i // 8] |= 1 << (i % 8)
+
+    return bytes(data)
+
+
+def encode_label(label: str) -> bytes:
+    return label.encode()[:16].ljust(16)
+
+
+class ZoneState:
+    __slots__ = ("alarm", "area", "bypassed", "label", "open")
+
+    def __init__(self, label: str, area: int) -> None:
+        self.label: str = label
+        self.area: int = area
+        self.open: bool = False
+        self.alarm: bool = False
+        self.bypassed: bool = False
+
+
+class AreaState:
+    __slots__ = ("alarm", "arm_mode", "label")
+
+    def __init__(self, label: str) -> None:
+        self.label: str = label
+        self.arm_mode: str | None = None  # "away", "stay", "sleep" or `None` when disarmed
+        self.alarm: bool = False
+
+
+class OutputState:
+    __slots__ = ("label", "on")
+
+    def __init__(self, label: str) -> None:
+        self.label: str = label
+        self.on: bool = False
+
+
+class Link:
+    # A client connection, carrying panel frames. Outgoing data is delayed by the emulator's latency and sent in order,
+    # one piece at a time.
+
+    pacing: float = 0
+
+    def __init__(self, emulator: PanelEmulator) -> None:
+        self.emulator: PanelEmulator = emulator
+        self.logged_in: bool = False
+        self._queue: asyncio.Queue[tuple[float, bytes]] = asyncio.Queue()
+        self._writer_task: asyncio.Task = asyncio.create_task(self._writer())
+
+    def send_frame(self, frame: bytes) -> None:
+        if random.random() < self.emulator.loss:
+            return
+
+        self.send_raw(self.wrap_frame(frame))
+
+    def send_raw(self, data: bytes) -> None:
+        self._queue.put_nowait((asyncio.get_running_loop().time() + self.emulator.latency / 1000, data))
+
+    def wrap_frame(self, frame: bytes) -> bytes:
+        return frame
+
+    def write(self, data: bytes) -> None:
+        raise NotImplementedError()
+
+    def close(self) -> None:
+        self._writer_task.cancel()
+        self.emulator.remove_link(self)
+
+    async def _writer(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            due_time, data = await self._queue.get()
+            delay = due_time - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            self.write(data)
+            if self.pacing:
+                await asyncio.sleep(self.pacing)
+
+
+class IPLink(Link, asyncio.Protocol):
+    # PAI handles everything it reads from the socket at once as a single message, so messages are paced apart
+    pacing = 0.001
+
+    def __init__(self, emulator: PanelEmulator) -> None:
+        super().__init__(emulator)
+
+        self._transport: asyncio.Transport | None = None
+        self._buffer: bytes = b""
+        self._key: bytes = emulator.ip_password
+
+    def connection_made(self, transport: asyncio.Transport) -> None:
+        self._transport = transport
+        if self.emulator.offline:
+            transport.close()
+            return
+
+        self.emulator.add_link(self)
+
+    def connection_lost(self, exc: Exception | None) -> None:
+        self._transport = None
+        self.close()
+
+    def data_received(self, data: bytes) -> None:
+        self._buffer += data
+        while len(self._buffer) >= IP_HEADER_SIZE:
+            if self._buffer[0] != 0xAA:
+                self._buffer = b""
+                break
+
+            length = self._buffer[1] | (self._buffer[2] << 8)
+            if self._buffer[4] & 0x01:  # encrypted payloads are padded to 16 bytes
+                length = (length + 15) // 16 * 16
+
+            if len(self._buffer) < IP_HEADER_SIZE + length:
+                break
+
+            message = self._buffer[: IP_HEADER_SIZE + length]
+            self._buffer = self._buffer[IP_HEADER_SIZE + length :]
+            self._handle_message(IPMessageRequest.parse(message, password=self._key))
+
+    def wrap_frame(self, frame: bytes) -> bytes:
+        return self._build_message(
+            IPMessageType.serial_passthrough_response, IPMessageCommand.passthrough, frame, self._key
+        )
+
+    def write(self, data: bytes) -> None:
+        if self._transport:
+            self._transport.write(data)
+
+    def close(self) -> None:
+        if self._transport:
+            self._transport.close()
+
+        super().close()
+
+    def _handle_message(self, message: Container) -> None:
+        if self.emulator.offline:
+            return
+
+        header = message.header
+        if header.message_type == IPMessageType.serial_passthrough_request:
+            self.emulator.handle_frame(self, message.payload)
+        elif header.command == IPMessageCommand.connect:
+            if message.payload != self.emulator.ip_password:
+                self._send_connect_response("invalid_password", b"\x00" * 16)
+                return
+
+            session_key = os.urandom(8).hex().encode()
+            self._send_connect_response("success", session_key)
+            self._key = session_key
+        else:  # keep alive, upload/download connection and the like are simply acknowledged
+            self.send_raw(self._build_message(IPMessageType.ip_response, header.command, b"\x00", self._key))
+
+    def _send_connect_response(self, login_status: str, session_key: bytes) -> None:
+        payload = IPPayloadConnectResponse.build(
+            {
+                "login_status": login_status,
+                "key": session_key,
+                "hardware_version": 0x0150,
+                "ip_firmware_major": 5,
+                "ip_firmware_minor": 2,
+                "ip_module_serial": IP_MODULE_SERIAL,
+            }
+        )
+        self.send_raw(
+            self._build_message(IPMessageType.ip_response, IPMessageCommand.connect, payload, self.emulator.ip_password)
+        )
+
+    @staticmethod
+    def _build_message(message_type: str, command: str, payload: bytes, key: bytes) -> bytes:
+        return IPMessageResponse.build(
+            {
+                "header": {
+                    "message_type": message_type,
+                    "command": command,
+                    "cryptor_code": "aes_256_ecb",
+                },
+                "payload": payload,
+            },
+            password=key,
+        )
+
+
+class PTYLink(Link):
+    # Exposes the panel's serial port as the slave end of a pseudo-terminal. Such a link can't be dropped; dropping it
+    # only resets the panel session.
+
+    def __init__(self, emulator: PanelEmulator) -> None:
+        super().__init__(emulator)
+
+        self._master_fd, self._slave_fd = os.openpty()
+        tty.setraw(self._slave_fd)
+        self.path: str = os.ttyname(self._slave_fd)
+        self._buffer: bytes = b""
+
+        asyncio.get_running_loop().add_reader(self._master_fd, self._on_readable)
+        emulator.add_link(self)
+
+    def write(self, data: bytes) -> None:
+        if random.random() < self.emulator.noise:
+            i = random.randrange(len(data))
+            data = data[:i] + bytes([data[i] ^ 0x5A]) + data[i + 1 :]
+
+        os.write(self._master_fd, self._garble(data))
+
+    def close(self) -> None:
+        asyncio.get_running_loop().remove_reader(self._master_fd)
+        os.close(self._master_fd)
+        os.close(self._slave_fd)
+
+        super().close()
+
+    def _garble(self, data: bytes) -> bytes:
+        # Data is exchanged at the client's baud rate, as set on the terminal; at any other than the panel's, each side
+        # reads garbage
+        baud = self.emulator.baud
+        if baud is None or termios.tcgetattr(self._slave_fd)[5] == getattr(termios, f"B{baud}"):
+            return data
+
+        return bytes(b ^ 0xFF for b in data)
+
+    def _on_readable(self) -> None:
+        self._buffer += self._garble(os.read(self._master_fd, 1024))
+        while len(self._buffer) >= FRAME_SIZE:
+            frame = self._buffer[:FRAME_SIZE]
+            if not is_valid_frame(frame):
+                self._buffer = self._buffer[1:]  # resynchronize
+                continue
+
+            self._buffer = self._buffer[FRAME_SIZE:]
+            if not self.emulator.offline:
+                self.emulator.handle_frame(self, frame)
+
+
+class PanelEmulator:
+    def __init__(
+        self,
+        *,
+        zones: int = MAX_ZONES,
+        areas: int = MAX_AREAS,
+        outputs: int = MAX_OUTPUTS,
+        users: int = 8,
+        panel_password: str = "1234",
+        ip_password: str = "paradox",
+        latency: float = 0,
+        loss: float = 0,
+        baud: int | None = None,
+        noise: float = 0,
+    ) -> None:
+        self.zones: dict[int, ZoneState] = {
+            i: ZoneState(f"Zone {i}", area=(i - 1) % areas + 1) for i in range(1, min(zones, MAX_ZONES) + 1)
+        }
+        self.areas: dict[int, AreaState] = {i: AreaState(f"Area {i}") for i in range(1, min(areas, MAX_AREAS) + 1)}
+        self.outputs: dict[int, OutputState] = {
+            i: OutputState(f"Output {i}") for i in range(1, min(outputs, MAX_OUTPUTS) + 1)
+        }
+        self.user_labels: dict[int, str] = {i: f"User {i}" for i in range(1, min(users, MAX_USERS) + 1)}
+        self.panel_password: bytes = bytes.fromhex(panel_password.zfill(4))
+        self.ip_password: bytes = ip_password.encode()
+        self.latency: float = latency  # milliseconds
+        self.loss: float = loss  # probability of dropping a panel frame
+        self.baud: int | None = baud  # serial baud rate; `None` works at any rate
+        self.noise: float = noise  # probability of corrupting a panel frame on the serial link
+        self.offline: bool = False
+
+        self.frame_count: int = 0
+        self._links: dict[Link, None] = {}  # ordered set
+        self._servers: list[asyncio.Server] = []
+        self._eeprom: bytes = self._make_eeprom()
+
+    async def start_tcp(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        loop = asyncio.get_running_loop()
+        server = await loop.create_server(lambda: IPLink(self), host, port)
+        self._servers.append(server)
+
+        return server.sockets[0].getsockname()[1]
+
+    def start_pty(self) -> str:
+        return PTYLink(self).path
+
+    async def stop(self) -> None:
+        for server in self._servers:
+            server.close()
+
+        for link in list(self._links):
+            link.close()
+
+        for server in self._servers:
+            await server.wait_closed()
+
+        self._servers.clear()
+
+    def add_link(self, link: Link) -> None:
+        self._links[link] = None
+
+    def remove_link(self, link: Link) -> None:
+        self._links.pop(link, None)
+
+    def drop_connections(self) -> None:
+        for link in list(self._links):
+            if isinstance(link, PTYLink):
+                link.logged_in = False
+            else:
+                link.close()
+
+    def set_zone_open(self, zone: int, open_: bool) -> None:
+        state = self.zones[zone]
+        if state.open != open_:
+            state.open = open_
+            self._send_event(EVENT_ZONE_OPEN if open_ else EVENT_ZONE_CLOSED, zone, state.area, state.label)
+
+    def set_zone_alarm(self, zone: int, alarm: bool) -> None:
+        state = self.zones[zone]
+        if state.alarm != alarm:
+            state.alarm = alarm
+            self._send_event(EVENT_ZONE_ALARM if alarm else EVENT_ZONE_ALARM_RESTORE, zone, state.area, state.label)
+
+            area_state = self.areas[state.area]
+            area_alarm = any(z.alarm for z in self.zones.values() if z.area == state.area)
+            if area_state.alarm != area_alarm:
+                area_state.alarm = area_alarm
+                minor = AREA_STATUS_AUDIBLE_ALARM if area_alarm else AREA_STATUS_ALARM_STOPPED
+                self._send_event(EVENT_AREA_STATUS, minor, state.area, area_state.label)
+
+    def set_zone_bypassed(self, zone: int, bypassed: bool) -> None:
+        state = self.zones[zone]
+        if state.bypassed != bypassed:
+            state.bypassed = bypassed
+            self._send_event(EVENT_ZONE_BYPASS, zone, state.area, state.label)
+
+    def set_area_arm_mode(self, area: int, arm_mode: str | None) -> None:
+        state = self.areas[area]
+        if state.arm_mode != arm_mode:
+            was_armed = state.arm_mode is not None
+            state.arm_mode = arm_mode
+            if was_armed != (arm_mode is not None):
+                minor = AREA_STATUS_ARMED if arm_mode else AREA_STATUS_DISARMED
+                self._send_event(EVENT_AREA_STATUS, minor, area, state.label)
+
+    def set_output_on(self, output: int, on: bool) -> None:
+        # PGM changes are only reported through status
+        self.outputs[output].on = on
+
+    async def run_script(self, lines: Iterable[str]) -> None:
+        for line in lines:
+            words = line.split("#", 1)[0].split()
+            if not words:
+                continue
+
+            logger.info("script: %s", " ".join(words))
+            command, args = words[0], [int(w) if w.isdigit() else w for w in words[1:]]
+            match command:
+                case "open" | "close":
+                    self.set_zone_open(args[0], command == "open")
+                case "alarm" | "restore":
+                    self.set_zone_alarm(args[0], command == "alarm")
+                case "bypass":
+                    self.set_zone_bypassed(args[0], not self.zones[args[0]].bypassed)
+                case "arm" | "arm_stay" | "arm_sleep":
+                    self.set_area_arm_mode(args[0], {"arm": "away", "arm_stay": "stay", "arm_sleep": "sleep"}[command])
+                case "disarm":
+                    self.set_area_arm_mode(args[0], None)
+                case "pgm":
+                    self.set_output_on(args[0], args[1] == "on")
+                case "drop":
+                    self.drop_connections()
+                case "offline" | "online":
+                    self.offline = command == "offline"
+                case "wait":
+                    await asyncio.sleep(float(args[0]))
+                case _:
+                    raise ValueError(f"Unknown script command: {command}")
+
+    def handle_frame(self, link: Link, frame: bytes) -> None:
+        self.frame_count += 1
+        command = frame[0]
+        if command == 0x72:  # InitiateCommunication
+            link.send_frame(self._make_initiate_response())
+        elif command == 0x5F:  # StartCommunication
+            link.send_frame(make_frame(0x00, 0, 0, 0, PRODUCT_ID, *FIRMWARE, PANEL_ID >> 8, PANEL_ID & 0xFF))
+        elif command == 0x00:  # InitializeCommunication
+            if frame[10:12] != self.panel_password:
+                link.send_frame(make_frame(0x70, 0, ERROR_INVALID_PC_PASSWORD))
+                return
+
+            link.logged_in = True
+            link.send_frame(make_frame(0x10, 0, 0, 0, (1 << len(self.areas)) - 1))
+        elif command == 0x50:  # ReadEEPROM, also used for reading RAM
+            address = (frame[2] << 8) | frame[3]
+            if address >= RAM_ADDRESS:
+                block = address - RAM_ADDRESS
+                link.send_frame(make_frame(0x50, 0, 0x80, block, data=self._make_ram_block(block)))
+            else:
+                link.send_frame(make_frame(0x50, 0, frame[2], frame[3], data=self._eeprom[address : address + 32]))
+        elif command == 0x40:  # PerformAction
+            self._perform_action(frame[2], frame[3])
+            link.send_frame(make_frame(0x40, 0, frame[2]))
+        elif command == 0x30:  # SetTimeDate
+            link.send_frame(make_frame(0x30))
+        elif command == 0x70:  # CloseConnection
+            link.logged_in = False
+        else:
+            logger.debug("ignoring frame %s", frame.hex())
+
+    def _perform_action(self, action: int, argument: int) -> None:
+        if action in ACTION_ARM_MODES:
+            self.set_area_arm_mode(argument + 1, ACTION_ARM_MODES[action])
+        elif action == ACTION_DISARM:
+            self.set_area_arm_mode(argument + 1, None)
+        elif action == ACTION_DISARM_ALL:
+            for area in self.areas:
+                self.set_area_arm_mode(area, None)
+        elif action == ACTION_BYPASS:
+            self.set_zone_bypassed(argument + 1, not self.zones[argument + 1].bypassed)
+        elif action in ACTION_PGM_ON:
+            self.set_output_on(argument + 1, True)
+        elif action in ACTION_PGM_OFF:
+            self.set_output_on(argument + 1, False)
+
+    def _send_event(self, major: int, minor: int, area: int, label: str) -> None:
+        now = datetime.datetime.now()
+        frame = make_frame(
+            0xE0,
+            now.year // 100,
+            now.year % 100,
+            now.month,
+            now.day,
+            now.hour,
+            now.minute,
+            major,
+            minor,
+            area - 1,
+            data=bytes(5) + encode_label(label),
+        )
+        for link in list(self._links):
+            if link.logged_in:
+                link.send_frame(frame)
+
+    def _make_initiate_response(self) -> bytes:
+        return make_frame(
+            0x72,
+            0xFF,  # new protocol
+            0,  # protocol id
+            1,  # protocol version
+            0,
+            0,
+            0,  # family id
+            PRODUCT_ID,
+            1,  # talker: controller application
+            FIRMWARE[0],
+            FIRMWARE[1] // 10 * 16 + FIRMWARE[1] % 10,  # hex encoded
+            FIRMWARE[2],
+            *SERIAL_NUMBER,
+            data=bytes(12) + b"MG5050  ",
+        )
+
+    def _make_eeprom(self) -> bytes:
+        eeprom = bytearray(EEPROM_SIZE)
+        labels = [
+            (ZONE_LABELS_ADDRESS, {i: z.label for i, z in self.zones.items()}),
+            (OUTPUT_LABELS_ADDRESS, {i: o.label for i, o in self.outputs.items()}),
+            (AREA_LABELS_ADDRESS, {i: a.label for i, a in self.areas.items()}),
+            (USER_LABELS_ADDRESS, self.user_labels),
+        ]
+        for base_address, type_labels in labels:
+            for i, label in type_labels.items():
+                address = base_address + (i - 1) * 16
+                eeprom[address : address + 16] = encode_label(label)
+
+        for i, zone in self.zones.items():
+            address = ZONE_DEFINITIONS_ADDRESS + (i - 1) * 3
+            eeprom[address : address + 3] = bytes([1, zone.area, 0x40])  # delay 1, bypassable
+
+        for i in self.outputs:
+            address = OUTPUT_DEFINITIONS_ADDRESS + (i - 1) * 6
+            eeprom[address : address + 6] = bytes([7, 0, 0, 0, 0, 0])  # activated by remote control access
+
+        return bytes(eeprom)
+
+    def _make_ram_block(self, block: int) -> bytes:
+        zones = [self.zones.get(i) for i in range(1, MAX_ZONES + 1)]
+        if block == 0:
+            now = datetime.datetime.now()
+            date = bytes([now.year // 100, now.year % 100, now.month, now.day, now.hour, now.minute])
+            power = bytes([0xB0, 0x90, 0x90])
+            zone_open = encode_bits((bool(z and z.open) for z in zones), 4)
+
+            return bytes(5) + date + power + bytes(1) + zone_open + bytes(13)
+
+        if block == 1:
+            areas_status = b""
+            for i in range(1, MAX_AREAS + 1):
+                area = self.areas.get(i)
+                status = bytearray(4)
+                if area:
+                    status[0] = {"away": 0x01, "stay": 0x05, "sleep": 0x03}.get(area.arm_mode, 0)
+                    if area.alarm:
+                        status[0] |= 0x40
+                    if any(z.bypassed for z in self.zones.values() if z.area == i):
+                        status[1] |= 0x08
+                    if not any(z.open for z in self.zones.values() if z.area == i):
+                        status[3] |= 0x01
+                areas_status += bytes(status)
+
+            return bytes(13) + areas_status + bytes(11)
+
+        if block == 2:
+            return bytes((0x40 if z.alarm else 0) | (0x08 if z.bypassed else 0) if z else 0 for z in zones)
+
+        if block == 7:
+            return bytes(0x20 if (o := self.outputs.get(i)) and o.on else 0 for i in range(1, 33))
+
+        return bytes(32)
+
+
+async def run(args: argparse.Namespace) -> None:
+    emulator = PanelEmulator(
+        zones=args.zones,
+        areas=args.areas,
+        outputs=args.outputs,
+        panel_password=args.panel_password,
+        ip_password=args.ip_password,
+        latency=args.latency,
+        loss=args.loss,
+        baud=args.baud,
+        noise=args.noise,
+    )
+
+    if args.tcp:
+        host, port = args.tcp.rsplit(":", 1)
+        port = await emulator.start_tcp(host, int(port))
+        print(f"listening on {host}:{port}")
+
+    if args.pty:
+        print(f"serial port at {emulator.start_pty()}")
+
+    if args.script:
+        with open(args.script) as f:
+            await emulator.run_script(f.readlines())
+
+    await asyncio.Event().wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tcp", help="address to listen on, e.g. 127.0.0.1:10000")
+    parser.add_argument("--pty", action="store_true", help="expose the panel on a pseudo-terminal")
+    parser.add_argument("--zones", type=int, default=MAX_ZONES)
+    parser.add_argument("--areas", type=int, default=MAX_AREAS)
+    parser.add_argument("--outputs", type=int, default=MAX_OUTPUTS)
+    parser.add_argument("--panel-password", default="1234")
+    parser.add_argument("--ip-password", default="paradox")
+    parser.add_argument("--latency", type=float, default=0, help="panel reply latency, in milliseconds")
+    parser.add_argument("--loss", type=float, default=0, help="probability of dropping a panel frame")
+    parser.add_argument("--baud", type=int, help="serial baud rate of the panel (any by default)")
+    parser.add_argument("--noise", type=float, default=0, help="probability of corrupting a serial panel frame")
+    parser.add_argument("--script", help="file with commands to run")
+    parser.add_argument("--debug", action="store_true")
+    args = parser.parse_args()
+
+    if not args.tcp and not args.pty:
+        parser.error("at least one of --tcp and --pty is required")
+
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.INFO)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
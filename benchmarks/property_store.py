@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+#
+# Compares memory usage and lookup time of the columnar property store against the nested dicts it replaced, as well
+# as reading a property through a cell bound to it, as ports do.
+#
+#     python benchmarks/property_store.py [--zones 192] [--lookups 1000000]
+
+import argparse
+import timeit
+import tracemalloc
+
+from collections.abc import Callable
+from typing import Any
+
+from qtoggleserver.paradox.store import PropertyStore
+
+
+BOOLEAN_PROPERTIES = [
+    "open",
+    "alarm",
+    "was_in_alarm",
+    "tamper",
+    "bypassed",
+    "fire",
+    "supervision_trouble",
+    "in_tx_delay",
+    "shutdown",
+    "generated_alarm",
+    "presently_in_alarm",
+    "activated_entry_delay",
+    "activated_intellizone_delay",
+]
+OTHER_PROPERTIES = {
+    "label": "Zone {id}",
+    "signal_strength": 0,
+}
+
+
+def make_properties(id_: int) -> dict[str, Any]:
+    properties = {name: bool(id_ % (i + 2)) for i, name in enumerate(BOOLEAN_PROPERTIES)}
+    properties.update(
+        {name: value.format(id=id_) if isinstance(value, str) else value for name, value in OTHER_PROPERTIES.items()}
+    )
+
+    return properties
+
+
+def build_dicts(zones: int) -> dict[str, dict[int, dict[str, Any]]]:
+    properties = {}
+    for id_ in range(1, zones + 1):
+        properties.setdefault("zone", {})[id_] = make_properties(id_)
+
+    return properties
+
+
+def build_store(zones: int) -> PropertyStore:
+    store = PropertyStore()
+    for id_ in range(1, zones + 1):
+        for name, value in make_properties(id_).items():
+            store.set("zone", id_, name, value)
+
+    return store
+
+
+def measure_memory(builder: Callable[[int], Any], zones: int) -> tuple[Any, int]:
+    tracemalloc.start()
+    result = builder(zones)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return result, size
+
+
+def measure_time(func: Callable[[], Any], number: int) -> float:
+    # Best of several runs, as the slower ones are mostly noise from the rest of the system
+    return min(timeit.repeat(func, number=number, repeat=5)) / number
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--zones", type=int, default=192)
+    parser.add_argument("--lookups", type=int, default=1000000)
+    args = parser.parse_args()
+
+    dicts, dicts_size = measure_memory(build_dicts, args.zones)
+    store, store_size = measure_memory(build_store, args.zones)
+
+    zone = args.zones // 2
+
+    def dicts_lookup(type_: str, id_: int | None, name: str) -> Any:
+        # The lookup previously done by `ParadoxAlarm.get_property()`
+        if type_ == "system":
+            return dicts.get(type_, {}).get(name)
+        else:
+            return dicts.get(type_, {}).get(id_, {}).get(name)
+
+    store_lookup = store.get
+    cell = store.get_cell("zone", zone, "open")
+
+    dicts_time = measure_time(lambda: dicts_lookup("zone", zone, "open"), args.lookups)
+    store_time = measure_time(lambda: store_lookup("zone", zone, "open"), args.lookups)
+    dicts_label_time = measure_time(lambda: dicts_lookup("zone", zone, "label"), args.lookups)
+    store_label_time = measure_time(lambda: store_lookup("zone", zone, "label"), args.lookups)
+    dicts_missing_time = measure_time(lambda: dicts_lookup("zone", args.zones + 1, "open"), args.lookups)
+    store_missing_time = measure_time(lambda: store_lookup("zone", args.zones + 1, "open"), args.lookups)
+    cell_time = measure_time(lambda: cell.value, args.lookups)
+
+    print(f"zones: {args.zones}, properties per zone: {len(BOOLEAN_PROPERTIES) + len(OTHER_PROPERTIES)}")
+    print(f"memory: dicts {dicts_size / 1024:.1f} KiB, store {store_size / 1024:.1f} KiB")
+    print(f"lookup (boolean): dicts {dicts_time * 1e9:.1f} ns, store {store_time * 1e9:.1f} ns")
+    print(f"lookup (string): dicts {dicts_label_time * 1e9:.1f} ns, store {store_label_time * 1e9:.1f} ns")
+    print(f"lookup (missing entity): dicts {dicts_missing_time * 1e9:.1f} ns, store {store_missing_time * 1e9:.1f} ns")
+    print(f"bound cell read: {cell_time * 1e9:.1f} ns")
+
+
+if __name__ == "__main__":
+    main()
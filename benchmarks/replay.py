@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+#
+# Feeds a capture of panel frames (see `capture_file`) back through a `ParadoxAlarm`, to reproduce bugs and to measure
+# how fast frames are handled:
+#
+#     python benchmarks/replay.py paradox.cap [--session -1] [--speed 1 | --max-speed]
+#
+# The panel connection is replaced by one that plays back received frames of a capture session. Each received frame is
+# held back until the alarm has sent as many frames as had been sent before it in the capture, so that replies follow
+# requests just like they did originally. At original speed, frames are also held back until their time comes.
+
+import argparse
+import asyncio
+import logging
+import time
+
+from typing import Any
+
+from paradox.connections.connection import Connection
+from paradox.paradox import Paradox
+
+from qtoggleserver.paradox import ParadoxAlarm, capture, constants, metrics, routing
+
+
+class ReplayProtocol:
+    def __init__(self) -> None:
+        self.sent_count: int = 0
+        self.sent_event: asyncio.Event = asyncio.Event()
+
+    def is_active(self) -> bool:
+        return True
+
+    def send_message(self, message: bytes) -> None:
+        self.sent_count += 1
+        self.sent_event.set()
+
+    def variable_message_length(self, mode: bool) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+
+class ReplayConnection(Connection):
+    def __init__(self, records: list[capture.Record], speed: float | None, sent_timeout: float) -> None:
+        super().__init__()
+
+        self._records: list[capture.Record] = records
+        self._speed: float | None = speed
+        self._sent_timeout: float = sent_timeout
+        self._protocol: ReplayProtocol = ReplayProtocol()
+        self.replay_task: asyncio.Task | None = None
+        self.received_count: int = 0
+        self.diverged_count: int = 0
+
+    async def connect(self) -> bool:
+        self.connected = True
+        self.replay_task = asyncio.create_task(self._replay())
+
+        return True
+
+    async def _replay(self) -> None:
+        protocol = self._protocol
+        start_time = time.perf_counter()
+        first_timestamp = self._records[0][0] if self._records else 0
+        sent_count = 0
+        missing_count = 0  # frames sent in the capture that the alarm didn't send
+
+        for timestamp, kind, frame in self._records:
+            if kind == capture.FRAME_SENT:
+                sent_count += 1
+                continue
+
+            if self._speed:
+                delay = (timestamp - first_timestamp) / self._speed - (time.perf_counter() - start_time)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+            # Wait for the alarm to send what it originally sent before this frame; it may not, e.g. for commands that
+            # were issued by the application, in which case the frame is fed anyway
+            deadline = time.perf_counter() + self._sent_timeout
+            while protocol.sent_count + missing_count < sent_count:
+                protocol.sent_event.clear()
+                try:
+                    await asyncio.wait_for(protocol.sent_event.wait(), deadline - time.perf_counter())
+                except TimeoutError:
+                    self.diverged_count += 1
+                    missing_count = sent_count - protocol.sent_count
+                    break
+
+            self.received_count += 1
+            self.on_message(frame)
+            await asyncio.sleep(0)  # let the frame be handled before feeding the next one
+
+
+class ReplayAlarm(ParadoxAlarm):
+    def __init__(self, connection: ReplayConnection, **kwargs) -> None:
+        self.replay_connection: ReplayConnection = connection
+
+        super().__init__(**kwargs)
+
+    def make_paradox(self) -> Paradox:
+        paradox = Paradox()
+        routing.attach(self, paradox)
+        paradox._connection = self.replay_connection
+        paradox._register_connection_handlers()
+
+        return paradox
+
+
+def load_session(path: str, session: int) -> list[capture.Record]:
+    sessions = []
+    for record in capture.read(path):
+        if record[1] == capture.SESSION_START:
+            sessions.append([])
+        elif sessions:
+            sessions[-1].append(record)
+
+    if not sessions:
+        raise SystemExit(f"{path} contains no sessions")
+    if not -len(sessions) <= session < len(sessions):
+        raise SystemExit(f"{path} contains only {len(sessions)} sessions")
+
+    return sessions[session]
+
+
+def count_frames(records: list[capture.Record], kind: int) -> int:
+    return sum(1 for _, k, _ in records if k == kind)
+
+
+async def run(args: argparse.Namespace) -> None:
+    records = load_session(args.capture_file, args.session)
+    speed = None if args.max_speed else args.speed
+    connection = ReplayConnection(records, speed, args.sent_timeout)
+
+    params: dict[str, Any] = {}
+    if args.zones:
+        params["zones"] = list(range(1, args.zones + 1))
+    if args.areas:
+        params["areas"] = list(range(1, args.areas + 1))
+
+    alarm = ReplayAlarm(connection, params={}, name="replay", serial_port="replay", **params)
+    start_time = time.perf_counter()
+    await alarm.enable()
+
+    while connection.replay_task is None:
+        await asyncio.sleep(0.01)
+    await connection.replay_task
+    duration = time.perf_counter() - start_time
+
+    changes = sum(c.value for c in alarm.get_metrics().get_counters(metrics.PROPERTY_CHANGES))
+    state = alarm.get_connection_state()
+    print(
+        f"replayed {connection.received_count} of {count_frames(records, capture.FRAME_RECEIVED)} received frames "
+        f"in {duration * 1000:.1f} ms ({connection.received_count / duration:.0f} frames/s)"
+    )
+    print(
+        f"sent {connection._protocol.sent_count} frames (capture has {count_frames(records, capture.FRAME_SENT)}), "
+        f"diverged {connection.diverged_count} times"
+    )
+    print(f"property changes: {changes:g}, connection state: {state}")
+
+    await alarm.handle_cleanup()
+
+    if state != constants.CONNECTION_STATE_RUNNING:
+        raise SystemExit(1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("capture_file")
+    parser.add_argument(
+        "--session", type=int, default=-1, help="index of the session to replay (negative from the end)"
+    )
+    parser.add_argument("--speed", type=float, default=1, help="playback speed, relative to the original")
+    parser.add_argument("--max-speed", action="store_true", help="play back as fast as frames are handled")
+    parser.add_argument("--sent-timeout", type=float, default=1, help="time, in seconds, to wait for the alarm")
+    parser.add_argument("--zones", type=int, default=0, help="number of zones to configure")
+    parser.add_argument("--areas", type=int, default=0, help="number of areas to configure")
+    parser.add_argument("--debug", action="store_true")
+    args = parser.parse_args()
+
+    if args.debug:
+        logging.basicConfig(level=logging.DEBUG)
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+#
+# Measures what the peripheral costs before it ever talks to a panel:
+#  * time to import the peripheral (after qToggleServer core), and whether that imports PAI
+#  * time to construct alarms
+#  * time of the one-time PAI import and setup, paid on first connect
+#
+#     python benchmarks/startup.py [--runs 10] [--alarms 10]
+#
+# Each run takes place in a fresh interpreter, so that imports aren't cached.
+
+import argparse
+import asyncio
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+
+def measure() -> dict[str, float]:
+    import qtoggleserver.core.main  # noqa: F401
+
+    start_time = time.perf_counter()
+    from qtoggleserver.paradox import ParadoxAlarm
+
+    import_time = time.perf_counter() - start_time
+    pai_imported = "paradox" in sys.modules
+
+    async def construct_and_setup(count: int) -> tuple[float, float]:
+        start_time = time.perf_counter()
+        alarms = [ParadoxAlarm(params={}, name=f"alarm{i}", ip_host="127.0.0.1") for i in range(count)]
+        construct_time = time.perf_counter() - start_time
+        for alarm in alarms:
+            await alarm.handle_cleanup()
+
+        # PAI grabs the event loop as it gets imported, so this has to happen on the loop, just like connecting does
+        start_time = time.perf_counter()
+        from qtoggleserver.paradox import pai
+
+        pai.setup()
+        setup_time = time.perf_counter() - start_time
+
+        return construct_time, setup_time
+
+    construct_time, setup_time = asyncio.run(construct_and_setup(int(sys.argv[2])))
+
+    return {"import": import_time, "pai_imported": pai_imported, "construct": construct_time, "setup": setup_time}
+
+
+def format_times(times: list[float]) -> str:
+    return f"median {statistics.median(times) * 1000:.1f} ms, min {min(times) * 1000:.1f} ms"
+
+
+def main() -> None:
+    if sys.argv[1:2] == ["--measure"]:
+        print(json.dumps(measure()))
+        return
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=10, help="number of fresh interpreters to measure in")
+    parser.add_argument("--alarms", type=int, default=10, help="number of alarms to construct in each run")
+    args = parser.parse_args()
+
+    results = []
+    for _ in range(args.runs):
+        output = subprocess.check_output([sys.executable, __file__, "--measure", str(args.alarms)])
+        results.append(json.loads(output))
+
+    print(f"import: {format_times([r['import'] for r in results])}")
+    print(f"PAI imported along: {any(r['pai_imported'] for r in results)}")
+    print(f"construct {args.alarms} alarms: {format_times([r['construct'] for r in results])}")
+    print(f"PAI import and setup, on first connect: {format_times([r['setup'] for r in results])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,15 @@
+import time
+
 from abc import ABCMeta
+from collections.abc import Iterable
 
 from qtoggleserver.core.typing import NullablePortValue, PortValue
 
-from . import constants
+from . import constants, metrics
 from .paradoxport import ParadoxPort
-from .typing import Property
+from .store import PropertyCell
+from .timers import Timer
+from .typing import Property, PropertyKey
 
 
 class AreaPort(ParadoxPort, metaclass=ABCMeta):
@@ -19,6 +24,9 @@ class AreaPort(ParadoxPort, metaclass=ABCMeta):
     def get_area_label(self) -> str:
         return self.get_property("label") or f"Area {self.area}"
 
+    def get_property_cell(self, name: str) -> PropertyCell:
+        return self.get_peripheral().get_property_cell("partition", self.area, name)
+
     def get_property(self, name: str) -> Property | None:
         return self.get_peripheral().get_property("partition", self.area, name)
 
@@ -71,52 +79,110 @@ class AreaArmedPort(AreaPort):
         4: constants.ARMED_MODE_ARMED_STAY,
     }
 
-    def __init__(self, *args, **kwargs) -> None:
-        super().__init__(*args, **kwargs)
+    _PENDING_STATES = ("pending", "arming")
 
-        self._requested_value: int | None = None  # used to cache written value while pending
-        self._last_state: str = self.get_property("current_state") or self._DEFAULT_STATE
-        self._last_non_pending_state: str = self._last_state
+    def __init__(self, timeout: int, *args, **kwargs) -> None:
+        self.timeout: int = timeout
 
-    async def attr_get_default_display_name(self) -> str:
-        return f"{self.get_area_label()} Armed"
+        super().__init__(*args, **kwargs)
 
-    async def read_value(self) -> NullablePortValue:
-        current_state = self.get_property("current_state") or self._DEFAULT_STATE
+        self._current_state_cell: PropertyCell = self.get_property_cell("current_state")
+        self._last_non_pending_state: str = self._current_state_cell.value or self._DEFAULT_STATE
 
-        # Only act on transitions
-        if current_state != self._last_state:
-            self.debug("state transition: %s -> %s", self._last_state, current_state)
-            self._last_state = current_state
+        # A value written via qToggle is shown as pending until the panel either reaches the requested state or, within
+        # `timeout` milliseconds, at least starts acting on it (e.g. exit delay); otherwise the request is rolled back
+        self._requested_value: int | None = None
+        self._request_time: float = 0
+        self._request_timer: Timer | None = None
 
-            if current_state not in ("pending", "arming"):
-                self._last_non_pending_state = current_state
-                if self._requested_value is not None:  # pending value requested via qToggle
-                    requested_state = self._ARMED_STATE_MAPPING[self._requested_value]
-                    self._requested_value = None
+    def get_property_keys(self) -> Iterable[PropertyKey]:
+        return [("partition", self.area, "current_state")]
+
+    async def attr_get_default_display_name(self) -> str:
+        return f"{self.get_area_label()} Armed"
 
-                    if current_state == requested_state:
-                        self.debug("requested state %s fulfilled", requested_state)
-                    else:
-                        self.debug("requested state %s not fulfilled", requested_state)
+    def on_property_change(
+        self, type_: str, id_: str | None, property_: str, old_value: Property, new_value: Property
+    ) -> None:
+        last_state = old_value or self._DEFAULT_STATE
+        current_state = new_value or self._DEFAULT_STATE
+        if current_state == last_state:  # e.g. the default state being confirmed by the panel
+            return
+
+        self.debug("state transition: %s -> %s", last_state, current_state)
+
+        if current_state in self._PENDING_STATES:
+            if self._requested_value is not None:
+                self._cancel_request_timer()  # the panel acts upon the request; no telling how long it will take
+            return
+
+        self._last_non_pending_state = current_state
+        if self._requested_value is None:
+            return
+
+        requested_state = self._ARMED_STATE_MAPPING[self._requested_value]
+        if current_state == requested_state:
+            duration = time.perf_counter() - self._request_time
+            self.debug("requested state %s confirmed after %.0f ms", requested_state, duration * 1000)
+            self.get_peripheral().get_metrics().histogram(metrics.ARMING_CONFIRM_TIME).observe(duration)
+            self._end_request()
+        else:
+            self._fail_request(f"panel reached state {current_state} instead", "rejected")
 
-        # Decide upon returned value
+    async def read_value(self) -> NullablePortValue:
         if self._requested_value is not None:
             return -self._requested_value
+
+        current_state = self._current_state_cell.value or self._DEFAULT_STATE
+        if current_state in self._PENDING_STATES:
+            # If state is pending, but we don't have a requested value, it's probably arming/disarming via some other
+            # external means. The best we can do is to indicate the opposite state as pending.
+            opposite_state = self._OPPOSITE_ARMED_STATE_MAPPING.get(
+                self._last_non_pending_state, self._last_non_pending_state
+            )
+            return -self._ARMED_STATE_MAPPING[opposite_state]
         else:
-            if current_state in ("pending", "arming"):
-                # If state is pending, but we don't have a requested value, it's probably arming/disarming via some
-                # other external means. The best we can do is to indicate the opposite state as pending.
-                opposite_state = self._OPPOSITE_ARMED_STATE_MAPPING.get(
-                    self._last_non_pending_state, self._last_non_pending_state
-                )
-                return -self._ARMED_STATE_MAPPING[opposite_state]
-            else:
-                return self._ARMED_STATE_MAPPING[current_state]
+            return self._ARMED_STATE_MAPPING[current_state]
 
     async def write_value(self, value: PortValue) -> None:
-        self._requested_value = value
-        await self.get_peripheral().set_area_armed_mode(self.area, self._ARMED_MODE_MAPPING[abs(value)])
+        value = abs(value)
+        peripheral = self.get_peripheral()
+        if self._requested_value is not None:
+            self._fail_request(f"superseded by {self._ARMED_STATE_MAPPING[value]}", "superseded")
+
+        # There's no transition to wait for if the panel is already in the requested state
+        if (self._current_state_cell.value or self._DEFAULT_STATE) != self._ARMED_STATE_MAPPING[value]:
+            self._requested_value = value
+            self._request_time = time.perf_counter()
+            self._request_timer = peripheral.call_later(self.timeout / 1000, self._on_request_timeout)
+            self.push_value()  # show the pending value right away
+
+        try:
+            await peripheral.set_area_armed_mode(self.area, self._ARMED_MODE_MAPPING[value])
+        except Exception:
+            if self._requested_value == value:
+                self._fail_request("command failed", "command")
+            raise
+
+    def _on_request_timeout(self) -> None:
+        self._request_timer = None
+        self._fail_request(f"no reaction from panel within {self.timeout} ms", "timeout")
+
+    def _fail_request(self, reason: str, kind: str) -> None:
+        self.error("requested state %s not fulfilled: %s", self._ARMED_STATE_MAPPING[self._requested_value], reason)
+        self.get_peripheral().get_metrics().counter(metrics.ARMING_FAILURES, reason=kind).inc()
+        self._end_request()
+        self.push_value()  # roll back to the panel state right away
+
+    def _end_request(self) -> None:
+        self._cancel_request_timer()
+        self._requested_value = None
+        self.invalidate_value()
+
+    def _cancel_request_timer(self) -> None:
+        if self._request_timer:
+            self._request_timer.cancel()
+            self._request_timer = None
 
 
 class AreaAlarmPort(AreaPort):
@@ -125,8 +191,16 @@ class AreaAlarmPort(AreaPort):
 
     ID = "alarm"
 
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+
+        self._alarm_cell: PropertyCell = self.get_property_cell("alarm")
+
+    def get_property_keys(self) -> Iterable[PropertyKey]:
+        return [("partition", self.area, "alarm")]
+
     async def attr_get_default_display_name(self) -> str:
         return f"{self.get_area_label()} Alarm"
 
     async def read_value(self) -> NullablePortValue:
-        return self.get_property("alarm")
+        return self._alarm_cell.value
@@ -0,0 +1,29 @@
+import random
+
+
+class Backoff:
+    # Exponential backoff with "equal jitter": each delay is picked randomly between half and the whole of the current
+    # exponential step, so that retries of several clients don't happen in lockstep
+
+    def __init__(self, min_delay: float, max_delay: float) -> None:
+        self._min_delay: float = min_delay
+        self._max_delay: float = max_delay
+        self._failures: int = 0
+
+    def get_failures(self) -> int:
+        return self._failures
+
+    def fail(self) -> float:
+        step = min(self._min_delay * 2 ** min(self._failures, 32), self._max_delay)
+        self._failures += 1
+
+        return random.uniform(step / 2, step)
+
+    def fail_long(self) -> float:
+        # Failures that are unlikely to go away soon are retried after the maximum delay
+        self._failures += 1
+
+        return random.uniform(self._max_delay / 2, self._max_delay)
+
+    def reset(self) -> None:
+        self._failures = 0
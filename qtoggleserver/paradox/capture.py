@@ -0,0 +1,131 @@
+import asyncio
+import os
+import struct
+import time
+
+from collections.abc import Iterator
+from typing import Any
+
+
+# Bump whenever the capture format changes
+VERSION = 1
+
+MAGIC = b"PDXC"
+
+HEADER = struct.Struct("<4sH")
+
+# Record: timestamp, kind and length, followed by the frame itself
+RECORD = struct.Struct("<dBH")
+
+FRAME_RECEIVED = 0
+FRAME_SENT = 1
+SESSION_START = 2  # marks a new connection to the panel; carries no frame
+
+
+type Record = tuple[float, int, bytes]
+
+
+class CaptureWriter:
+    # Records raw frames exchanged with the panel into a capture file. Frames are only buffered on the event loop, while
+    # a background task writes them out in batches.
+    #
+    # Frames are appended to captures of previous runs, each connection starting with a session record. Once the file
+    # would grow past `max_size`, it is moved to `<path>.1` (replacing the previous one) and a new file is started.
+
+    def __init__(self, path: str, max_size: int) -> None:
+        self._path: str = path
+        self._max_size: int = max_size
+        self._open()
+        self._buffer: list[bytes] = []
+        self._wakeup: asyncio.Event = asyncio.Event()
+        self._closing: bool = False
+        self._task: asyncio.Task = asyncio.create_task(self._run())
+
+    def attach(self, connection: Any) -> None:
+        # Capture frames passing through the given PAI connection, as they are received and sent
+        on_message = connection.on_message
+        write = connection.write
+
+        def capturing_on_message(raw: bytes) -> None:
+            self.record(FRAME_RECEIVED, raw)
+            on_message(raw)
+
+        def capturing_write(data: bytes) -> None:
+            self.record(FRAME_SENT, data)
+            write(data)
+
+        connection.on_message = capturing_on_message
+        connection.write = capturing_write
+
+    def record(self, kind: int, frame: bytes = b"") -> None:
+        self._buffer.append(RECORD.pack(time.time(), kind, len(frame)) + frame)
+        self._wakeup.set()
+
+    async def close(self) -> None:
+        # Let the writer task drain the buffer and exit, rather than cancelling it, so that a write that is in progress
+        # isn't overlapped by another one
+        self._closing = True
+        self._wakeup.set()
+        await self._task
+        self._file.close()
+
+    async def _run(self) -> None:
+        while not self._closing:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            await asyncio.to_thread(self._write, self._take_buffer())
+
+        # Frames recorded while the last batch was being written
+        if self._buffer:
+            await asyncio.to_thread(self._write, self._take_buffer())
+
+    def _take_buffer(self) -> bytes:
+        buffer = self._buffer
+        self._buffer = []
+
+        return b"".join(buffer)
+
+    def _open(self) -> None:
+        try:
+            with open(self._path, "rb") as f:
+                header = f.read(HEADER.size)
+        except FileNotFoundError:
+            header = b""
+
+        if header and header != HEADER.pack(MAGIC, VERSION):
+            os.replace(self._path, f"{self._path}.1")  # not a capture of this version; keep it rather than append to it
+
+        self._file = open(self._path, "ab")
+        self._size: int = self._file.tell()
+        if not self._size:
+            self._file.write(HEADER.pack(MAGIC, VERSION))
+            self._size = HEADER.size
+
+    def _write(self, data: bytes) -> None:
+        if self._size + len(data) > self._max_size and self._size > HEADER.size:
+            self._file.close()
+            os.replace(self._path, f"{self._path}.1")
+            self._open()
+
+        self._file.write(data)
+        self._file.flush()
+        self._size += len(data)
+
+
+def read(path: str) -> Iterator[Record]:
+    with open(path, "rb") as f:
+        header = f.read(HEADER.size)
+        if len(header) < HEADER.size or HEADER.unpack(header) != (MAGIC, VERSION):
+            raise ValueError(f"{path} is not a capture file of version {VERSION}")
+
+        while True:
+            data = f.read(RECORD.size)
+            if len(data) < RECORD.size:
+                return  # a truncated record at the end is left out
+
+            timestamp, kind, length = RECORD.unpack(data)
+            frame = f.read(length)
+            if len(frame) < length:
+                return
+
+            yield timestamp, kind, frame
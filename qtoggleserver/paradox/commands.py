@@ -0,0 +1,221 @@
+import asyncio
+import itertools
+
+from collections.abc import Awaitable, Callable, Iterable
+from typing import Any
+
+from . import exceptions
+
+
+# Command kinds, named after the PAI storage types they control
+KIND_PARTITION = "partition"
+KIND_ZONE = "zone"
+KIND_PGM = "pgm"
+
+# Arming and disarming take precedence over everything else
+PRIORITIES = {
+    KIND_PARTITION: 0,
+    KIND_ZONE: 1,
+    KIND_PGM: 1,
+}
+
+
+type CommandKey = tuple[str, tuple[int, ...], str]
+
+
+class CommandBatch:
+    __slots__ = ("action", "future", "ids", "kind")
+
+    def __init__(self, kind: str, action: str) -> None:
+        self.kind: str = kind
+        self.action: str = action
+        self.ids: dict[int, None] = {}  # ordered set
+        self.future: asyncio.Future[bool] = asyncio.get_running_loop().create_future()
+
+
+class CommandCoalescer:
+    # Gathers commands of the same kind and action submitted within a short window into a single panel call carrying
+    # all their ids. Every submitter awaits the outcome of the call its ids ended up in.
+
+    def __init__(self, window: int, send: Callable[[str, list[int], str], Awaitable[bool]]) -> None:
+        self._window: int = window
+        self._send: Callable[[str, list[int], str], Awaitable[bool]] = send
+        self._batches: dict[tuple[str, str], CommandBatch] = {}  # batches still gathering ids
+        self._sending_batches: set[CommandBatch] = set()
+        self._tasks: set[asyncio.Task] = set()
+
+    async def submit(self, kind: str, ids: Iterable[int], action: str) -> bool:
+        key = (kind, action)
+        batch = self._batches.get(key)
+        if batch is None:
+            batch = self._batches[key] = CommandBatch(kind, action)
+            task = asyncio.create_task(self._flush_later(key))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+        batch.ids.update(dict.fromkeys(ids))
+
+        # Shield the batch future, so that a cancelled submitter doesn't cancel the command for everybody else
+        return await asyncio.shield(batch.future)
+
+    def cancel_all(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+
+        for batch in itertools.chain(self._batches.values(), self._sending_batches):
+            batch.future.cancel()
+
+        self._batches.clear()
+        self._sending_batches.clear()
+
+    async def _flush_later(self, key: tuple[str, str]) -> None:
+        batch = self._batches[key]
+        try:
+            await asyncio.sleep(self._window / 1000)
+
+            del self._batches[key]
+            self._sending_batches.add(batch)
+            result = await self._send(batch.kind, list(batch.ids), batch.action)
+        except Exception as e:
+            if not batch.future.done():
+                batch.future.set_exception(e)
+        else:
+            if not batch.future.done():
+                batch.future.set_result(result)
+        finally:
+            # Whatever interrupted the batch (e.g. cancellation of this task or of the command it was sent as), its
+            # submitters must not be left waiting
+            if self._batches.get(key) is batch:
+                del self._batches[key]
+            self._sending_batches.discard(batch)
+            if not batch.future.done():
+                batch.future.cancel()
+
+
+class Command:
+    __slots__ = ("deadline", "enqueue_time", "future", "key")
+
+    def __init__(self, key: CommandKey, enqueue_time: float, deadline: float) -> None:
+        self.key: CommandKey = key
+        self.enqueue_time: float = enqueue_time
+        self.deadline: float = deadline
+        self.future: asyncio.Future[bool] = asyncio.get_running_loop().create_future()
+
+
+class CommandScheduler:
+    # Sends commands to the panel one at a time, in order of priority. A command identical to one that is already
+    # queued or in flight shares its outcome instead of being sent again. Commands not completed within `timeout`
+    # milliseconds from being scheduled fail with `ParadoxTimeout`.
+
+    def __init__(self, timeout: int, send: Callable[[str, list[int], str], Awaitable[bool]]) -> None:
+        self._timeout: int = timeout
+        self._send: Callable[[str, list[int], str], Awaitable[bool]] = send
+        self._queue: asyncio.PriorityQueue[tuple[int, int, Command]] = asyncio.PriorityQueue()
+        self._commands: dict[CommandKey, Command] = {}  # queued and in-flight commands
+        self._counter: itertools.count = itertools.count()
+        self._worker_task: asyncio.Task | None = None
+        self._current_command: Command | None = None
+
+        self._executed_count: int = 0
+        self._total_wait_time: float = 0
+        self._max_wait_time: float = 0
+        self._last_wait_time: float = 0
+
+    async def execute(self, kind: str, ids: list[int], action: str) -> bool:
+        key = (kind, tuple(ids), action)
+        loop = asyncio.get_running_loop()
+        command = self._commands.get(key)
+        if command is None:
+            now = loop.time()
+            command = self._commands[key] = Command(key, now, now + self._timeout / 1000)
+            self._queue.put_nowait((PRIORITIES.get(kind, 1), next(self._counter), command))
+            if not self._worker_task:
+                self._worker_task = asyncio.create_task(self._worker())
+
+        # The deadline is enforced here as well, since a command stuck behind others in the queue isn't looked at by the
+        # worker until it gets its turn
+        try:
+            return await asyncio.wait_for(asyncio.shield(command.future), command.deadline - loop.time())
+        except TimeoutError:
+            if command.future.done():
+                return command.future.result()
+
+            self._expire(command)
+            raise exceptions.ParadoxTimeout(f"Timeout executing {kind} command {action}") from None
+
+    def get_stats(self) -> dict[str, Any]:
+        # The queue may still hold expired commands, so queued ones are counted among the known ones instead
+        in_flight = int(self._current_command is not None)
+        queued = len(self._commands)
+        if in_flight and self._commands.get(self._current_command.key) is self._current_command:
+            queued -= 1
+
+        return {
+            "queue_depth": queued,
+            "in_flight": in_flight,
+            "executed": self._executed_count,
+            "last_wait_time": self._last_wait_time,
+            "max_wait_time": self._max_wait_time,
+            "average_wait_time": self._total_wait_time / self._executed_count if self._executed_count else 0,
+        }
+
+    def cancel_all(self) -> None:
+        if self._worker_task:
+            self._worker_task.cancel()
+            self._worker_task = None
+
+        for command in self._commands.values():
+            command.future.cancel()
+
+        self._commands.clear()
+        self._queue = asyncio.PriorityQueue()
+
+    def _expire(self, command: Command) -> None:
+        # Fail the command for everybody sharing it and forget it, so that the worker drops it without sending it and
+        # an identical command scheduled afterwards is sent anew
+        kind, _, action = command.key
+        command.future.set_exception(exceptions.ParadoxTimeout(f"Timeout executing {kind} command {action}"))
+        command.future.exception()  # not every sharer is necessarily around to retrieve it
+        self._forget(command)
+
+    def _forget(self, command: Command) -> None:
+        if self._commands.get(command.key) is command:
+            del self._commands[command.key]
+
+    async def _worker(self) -> None:
+        while True:
+            _, _, command = await self._queue.get()
+            if command.future.done():  # expired while queued
+                continue
+
+            self._current_command = command
+            try:
+                await self._run(command)
+            finally:
+                self._current_command = None
+                self._forget(command)
+
+    async def _run(self, command: Command) -> None:
+        kind, ids, action = command.key
+        now = asyncio.get_running_loop().time()
+        wait_time = now - command.enqueue_time
+        self._executed_count += 1
+        self._total_wait_time += wait_time
+        self._max_wait_time = max(self._max_wait_time, wait_time)
+        self._last_wait_time = wait_time
+
+        try:
+            remaining = command.deadline - now
+            if remaining <= 0:
+                raise TimeoutError()
+
+            result = await asyncio.wait_for(self._send(kind, list(ids), action), remaining)
+        except TimeoutError:
+            if not command.future.done():
+                self._expire(command)
+        except Exception as e:
+            if not command.future.done():
+                command.future.set_exception(e)
+        else:
+            if not command.future.done():
+                command.future.set_result(result)
@@ -1,4 +1,7 @@
 DEFAULT_SERIAL_BAUD = 9600
+SERIAL_BAUD_AUTO = "auto"
+SERIAL_BAUD_RATES = [115200, 57600, 38400, 19200, 9600]  # fastest first, for detection
+SERIAL_PROBE_TIMEOUT = 1
 DEFAULT_IP_PORT = 10000
 DEFAULT_IP_PASSWORD = "paradox"
 DEFAULT_PANEL_PASSWORD = "1234"
@@ -17,3 +20,19 @@ PGM_ACTION_ON_OVERRIDE = "on_override"
 PGM_ACTION_PULSE = "pulse"
 
 DEFAULT_REMOTE_BUTTONS_TIMEOUT = 1000
+DEFAULT_ARMING_TIMEOUT = 15000
+DEFAULT_OUTPUT_PULSE_DURATION = 1000
+DEFAULT_CHANGE_BATCH_WINDOW = 5
+DEFAULT_PROPERTIES_SWEEP_INTERVAL = 300
+DEFAULT_COMMAND_BATCH_WINDOW = 10
+DEFAULT_COMMAND_TIMEOUT = 10000
+DEFAULT_RECONNECT_MIN_DELAY = 1000
+DEFAULT_RECONNECT_MAX_DELAY = 60000
+DEFAULT_JOURNAL_SIZE = 16384
+DEFAULT_CAPTURE_SIZE = 16384
+
+CONNECTION_STATE_DISCONNECTED = "disconnected"
+CONNECTION_STATE_CONNECTING = "connecting"
+CONNECTION_STATE_LINK_UP = "link_up"
+CONNECTION_STATE_AUTHENTICATED = "authenticated"
+CONNECTION_STATE_RUNNING = "running"
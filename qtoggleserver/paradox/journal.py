@@ -0,0 +1,360 @@
+import json
+import mmap
+import struct
+import time
+
+from typing import Any
+
+from .typing import Property
+
+
+# Bump whenever the journal format changes; journals of other versions are discarded
+VERSION = 2
+
+MAGIC = b"PDXJ"
+
+# Header: magic, version, record capacity, string table capacity, string count, total number of records ever appended
+HEADER = struct.Struct("<4sHIIIQ")
+HEADER_SIZE = 64
+
+# Strings (types, property names and string values) are interned into a table of fixed-size entries, so that records
+# only refer to them by index. Entries are reference counted by the records in the ring, and freed once the last of
+# them is overwritten; when the table is still full, the oldest records give up their string values, so that newer
+# changes are recorded at the expense of older ones.
+STRING = struct.Struct("<B63s")
+STRING_MAX_LENGTH = 63
+STRING_MAX_CAPACITY = 4096
+STRING_SIZE_RATIO = 4  # the string table takes at most a quarter of the journal size
+
+# Smallest journal size, leaving room for 256 strings and about 1400 records
+MIN_SIZE = 65536
+
+# Record: timestamp, type, property, id, then a (tag, payload) pair for each of the old and new values; the leading
+# key part is all that queries need to unpack for records that don't match
+RECORD_KEY = struct.Struct("<dHHi")
+RECORD = struct.Struct("<dHHiB8sB8s")
+
+NO_ID = -1
+
+TAG_NONE = 0
+TAG_BOOL = 1
+TAG_INT = 2
+TAG_FLOAT = 3
+TAG_STRING = 4
+TAG_JSON = 5  # other JSON-serializable values, interned as strings
+TAG_UNKNOWN = 6  # values that couldn't be recorded (e.g. too long, or string table full)
+TAG_SHORT_STRING = 7  # strings that fit in the payload, stored inline rather than interned
+
+INT64 = struct.Struct("<q")
+FLOAT64 = struct.Struct("<d")
+NO_PAYLOAD = bytes(8)
+SHORT_STRING_MAX_LENGTH = len(NO_PAYLOAD)
+
+# Properties that change on their own, all the time (the panel clock), and carry nothing worth recording
+UNRECORDED_PROPERTIES = {("system", "time"), ("system", "date")}
+
+
+class Unknown:
+    # Type of `UNKNOWN`, which stands for values that couldn't be recorded; unlike `None`, it's never a property value
+
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return "UNKNOWN"
+
+
+UNKNOWN = Unknown()
+
+
+class Journal:
+    # Append-only, memory-mapped journal of property changes, made of fixed-size records written in a ring; once full,
+    # the oldest records are overwritten
+
+    def __init__(self, path: str, size: int) -> None:
+        if size < MIN_SIZE:
+            raise ValueError(f"journal size must be at least {MIN_SIZE} bytes")
+
+        # Both the string table and the records are sized so that the file never grows past `size`
+        self._string_capacity: int = min(STRING_MAX_CAPACITY, size // STRING_SIZE_RATIO // STRING.size)
+        self._capacity: int = (size - HEADER_SIZE - self._string_capacity * STRING.size) // RECORD.size
+        self._records_offset: int = HEADER_SIZE + self._string_capacity * STRING.size
+        file_size = self._records_offset + self._capacity * RECORD.size
+
+        self._file = open(path, "a+b")
+        self._file.seek(0)
+        header = self._file.read(HEADER.size)
+        self._file.truncate(file_size)  # a file of a different size or format is started over below
+        self._mmap: mmap.mmap = mmap.mmap(self._file.fileno(), file_size)
+
+        self._strings: list[str | None] = []  # `None` for free entries
+        self._string_indices: dict[str, int] = {}
+        self._string_refs: list[int] = []  # number of records in the ring referring to each entry
+        self._free_strings: list[int] = []
+        self._count: int = 0
+        self._evicted_count: int = 0  # records before this one have no string values left
+
+        if len(header) == HEADER.size:
+            magic, version, capacity, string_capacity, string_count, count = HEADER.unpack(header)
+            if (magic, version, capacity, string_capacity) == (MAGIC, VERSION, self._capacity, self._string_capacity):
+                self._count = count
+                self._load_strings(string_count)
+                return
+
+        self._write_header()
+
+    def close(self) -> None:
+        self._mmap.flush()
+        self._mmap.close()
+        self._file.close()
+
+    def flush(self) -> None:
+        self._mmap.flush()
+
+    def get_capacity(self) -> int:
+        return self._capacity
+
+    def get_count(self) -> int:
+        # Number of records currently in the journal
+        return min(self._count, self._capacity)
+
+    def append(
+        self, type_: str, id_: int | None, name: str, old_value: Property | None, new_value: Property | None
+    ) -> None:
+        if (type_, name) in UNRECORDED_PROPERTIES:
+            return
+
+        type_index = self._intern(type_)
+        name_index = self._intern(name)
+        if type_index is None or name_index is None:
+            for index in (type_index, name_index):
+                if index is not None:
+                    self._release_string(index)
+            return
+
+        old_tag, old_payload = self._encode_value(old_value)
+        new_tag, new_payload = self._encode_value(new_value)
+
+        # Strings of the new record are interned before those of the overwritten one are released, so that entries
+        # shared by both aren't freed in between
+        offset = self._records_offset + (self._count % self._capacity) * RECORD.size
+        if self._count >= self._capacity:
+            self._release_record(offset)
+
+        RECORD.pack_into(
+            self._mmap,
+            offset,
+            time.time(),
+            type_index,
+            name_index,
+            NO_ID if id_ is None else id_,
+            old_tag,
+            old_payload,
+            new_tag,
+            new_payload,
+        )
+
+        # The header is updated only after the record is in place, so that a crash never exposes a partial record
+        self._count += 1
+        self._write_header()
+
+    def query(
+        self,
+        type_: str | None = None,
+        id_: int | None = None,
+        name: str | None = None,
+        since: float | None = None,
+        until: float | None = None,
+        limit: int | None = None,
+    ) -> list[dict[str, Any]]:
+        # Return matching records, oldest first; when `limit` is given, only the newest `limit` ones are returned.
+        # Records are scanned from newest to oldest and only their key part is unpacked until they match. Since records
+        # are appended in time order, scanning stops at the first record older than `since`.
+        type_index = name_index = None
+        if type_ is not None:
+            type_index = self._string_indices.get(type_)
+            if type_index is None:
+                return []
+        if name is not None:
+            name_index = self._string_indices.get(name)
+            if name_index is None:
+                return []
+
+        records = []
+        for i in range(self._count - 1, self._count - 1 - self.get_count(), -1):
+            offset = self._records_offset + (i % self._capacity) * RECORD.size
+            timestamp, record_type_index, record_name_index, record_id = RECORD_KEY.unpack_from(self._mmap, offset)
+            if since is not None and timestamp < since:
+                break
+            if until is not None and timestamp >= until:
+                continue
+            if type_index is not None and record_type_index != type_index:
+                continue
+            if name_index is not None and record_name_index != name_index:
+                continue
+            if id_ is not None and record_id != id_:
+                continue
+
+            records.append(self._decode_record(offset))
+            if limit is not None and len(records) >= limit:
+                break
+
+        records.reverse()
+
+        return records
+
+    def _decode_record(self, offset: int) -> dict[str, Any]:
+        timestamp, type_index, name_index, id_, old_tag, old_payload, new_tag, new_payload = RECORD.unpack_from(
+            self._mmap, offset
+        )
+
+        return {
+            "timestamp": timestamp,
+            "type": self._strings[type_index],
+            "id": None if id_ == NO_ID else id_,
+            "property": self._strings[name_index],
+            "old_value": self._decode_value(old_tag, old_payload),
+            "new_value": self._decode_value(new_tag, new_payload),
+        }
+
+    def _encode_value(self, value: Property | None) -> tuple[int, bytes]:
+        match value:
+            case None:
+                return TAG_NONE, NO_PAYLOAD
+            case bool():
+                return TAG_BOOL, INT64.pack(value)
+            case int() if -(2**63) <= value < 2**63:
+                return TAG_INT, INT64.pack(value)
+            case float():
+                return TAG_FLOAT, FLOAT64.pack(value)
+            case str():
+                data = value.encode()
+                if len(data) <= SHORT_STRING_MAX_LENGTH and b"\0" not in data:
+                    return TAG_SHORT_STRING, data.ljust(SHORT_STRING_MAX_LENGTH, b"\0")
+                tag = TAG_STRING
+            case _:
+                tag = TAG_JSON
+                try:
+                    value = json.dumps(value, separators=(",", ":"), default=str)
+                except ValueError:
+                    return TAG_UNKNOWN, NO_PAYLOAD
+
+        index = self._intern(value)
+        if index is None:
+            return TAG_UNKNOWN, NO_PAYLOAD
+
+        return tag, INT64.pack(index)
+
+    def _decode_value(self, tag: int, payload: bytes) -> Property | Unknown | None:
+        if tag == TAG_NONE:
+            return None
+        elif tag == TAG_BOOL:
+            return bool(INT64.unpack(payload)[0])
+        elif tag == TAG_INT:
+            return INT64.unpack(payload)[0]
+        elif tag == TAG_FLOAT:
+            return FLOAT64.unpack(payload)[0]
+        elif tag == TAG_SHORT_STRING:
+            return payload.rstrip(b"\0").decode()
+        elif tag == TAG_STRING:
+            return self._strings[INT64.unpack(payload)[0]]
+        elif tag == TAG_JSON:
+            return json.loads(self._strings[INT64.unpack(payload)[0]])
+
+        return UNKNOWN
+
+    def _intern(self, s: str) -> int | None:
+        # Return the index of the entry holding the given string, with one more reference to it
+        index = self._string_indices.get(s)
+        if index is not None:
+            self._string_refs[index] += 1
+            return index
+
+        data = s.encode()
+        if len(data) > STRING_MAX_LENGTH:
+            return None
+        if len(self._string_indices) >= self._string_capacity and not self._evict_values():
+            return None
+
+        if self._free_strings:
+            index = self._free_strings.pop()
+            self._strings[index] = s
+            self._string_refs[index] = 1
+        else:
+            index = len(self._strings)
+            self._strings.append(s)
+            self._string_refs.append(1)
+
+        STRING.pack_into(self._mmap, HEADER_SIZE + index * STRING.size, len(data), data)
+        self._string_indices[s] = index
+        self._write_header()
+
+        return index
+
+    def _release_string(self, index: int) -> None:
+        self._string_refs[index] -= 1
+        if not self._string_refs[index]:
+            del self._string_indices[self._strings[index]]
+            self._strings[index] = None
+            self._free_strings.append(index)
+
+    def _get_record_strings(self, offset: int) -> list[int]:
+        # Indices of the string entries a record refers to
+        _, type_index, name_index, _, old_tag, old_payload, new_tag, new_payload = RECORD.unpack_from(
+            self._mmap, offset
+        )
+        indices = [type_index, name_index]
+        for tag, payload in ((old_tag, old_payload), (new_tag, new_payload)):
+            if tag in (TAG_STRING, TAG_JSON):
+                indices.append(INT64.unpack(payload)[0])
+
+        return indices
+
+    def _evict_values(self) -> bool:
+        # Drop string values of the oldest records, until a string table entry is freed; return `False` if none could be
+        self._evicted_count = max(self._evicted_count, self._count - self.get_count())
+        size = len(self._string_indices)
+        while self._evicted_count < self._count and len(self._string_indices) >= size:
+            offset = self._records_offset + (self._evicted_count % self._capacity) * RECORD.size
+            timestamp, type_index, name_index, id_, old_tag, old_payload, new_tag, new_payload = RECORD.unpack_from(
+                self._mmap, offset
+            )
+            if old_tag in (TAG_STRING, TAG_JSON):
+                self._release_string(INT64.unpack(old_payload)[0])
+                old_tag, old_payload = TAG_UNKNOWN, NO_PAYLOAD
+            if new_tag in (TAG_STRING, TAG_JSON):
+                self._release_string(INT64.unpack(new_payload)[0])
+                new_tag, new_payload = TAG_UNKNOWN, NO_PAYLOAD
+            RECORD.pack_into(
+                self._mmap, offset, timestamp, type_index, name_index, id_, old_tag, old_payload, new_tag, new_payload
+            )
+            self._evicted_count += 1
+
+        return len(self._string_indices) < size
+
+    def _release_record(self, offset: int) -> None:
+        for index in self._get_record_strings(offset):
+            self._release_string(index)
+
+    def _load_strings(self, count: int) -> None:
+        # Reference counts aren't stored; they're rebuilt from the records in the ring, and entries that no record
+        # refers to are freed
+        self._string_refs = [0] * count
+        for i in range(self.get_count()):
+            for index in self._get_record_strings(self._records_offset + i * RECORD.size):
+                self._string_refs[index] += 1
+
+        for index in range(count):
+            if not self._string_refs[index]:
+                self._strings.append(None)
+                self._free_strings.append(index)
+                continue
+
+            length, data = STRING.unpack_from(self._mmap, HEADER_SIZE + index * STRING.size)
+            s = data[:length].decode()
+            self._strings.append(s)
+            self._string_indices[s] = index
+
+    def _write_header(self) -> None:
+        HEADER.pack_into(
+            self._mmap, 0, MAGIC, VERSION, self._capacity, self._string_capacity, len(self._strings), self._count
+        )
@@ -0,0 +1,119 @@
+import asyncio
+import time
+
+from typing import Any
+
+from . import metrics
+
+
+FRAME_SIZE = 37
+
+# Generic InitiateCommunication request (command 7), understood by all panels at any stage of a session
+INITIATE_COMMUNICATION = bytes([0x72]) + bytes(35) + bytes([0x72])
+
+
+def find_frame(data: bytes, command: int) -> bool:
+    # Tell whether the data contains a valid fixed-size frame of the given command
+    for i in range(len(data) - FRAME_SIZE + 1):
+        if data[i] >> 4 == command and sum(data[i : i + FRAME_SIZE - 1]) & 0xFF == data[i + FRAME_SIZE - 1]:
+            return True
+
+    return False
+
+
+async def probe_serial(port: str, baud: int, timeout: float) -> float | None:
+    # Send an InitiateCommunication request at the given baud rate, returning the round trip time of a valid reply or
+    # `None` if none came in time
+    import serial_asyncio
+
+    reader, writer = await asyncio.wait_for(serial_asyncio.open_serial_connection(url=port, baudrate=baud), timeout)
+    try:
+        start_time = time.perf_counter()
+        writer.write(INITIATE_COMMUNICATION)
+
+        data = b""
+        while not find_frame(data, INITIATE_COMMUNICATION[0] >> 4):
+            remaining = start_time + timeout - time.perf_counter()
+            if remaining <= 0:
+                return None
+
+            try:
+                data += await asyncio.wait_for(reader.read(256), remaining)
+            except TimeoutError:
+                return None
+
+        return time.perf_counter() - start_time
+    finally:
+        writer.close()
+
+
+class LinkMonitor:
+    # Measures the quality of the link to the panel, by watching the frames passing through a PAI connection: round
+    # trip time of requests, requests left without reply and, on serial links, bytes discarded by framing (e.g. due to
+    # noise or a wrong baud rate)
+
+    def __init__(self, metrics_: metrics.Metrics) -> None:
+        self._metrics: metrics.Metrics = metrics_
+        self._request_time: float | None = None
+        self._received_bytes: int = 0
+        self._framed_bytes: int = 0
+        self._discarded_bytes: int = 0
+
+    def attach(self, connection: Any) -> None:
+        on_message = connection.on_message
+        write = connection.write
+
+        def monitored_on_message(raw: bytes) -> None:
+            self._on_frame_received(raw)
+            on_message(raw)
+
+        def monitored_write(data: bytes) -> None:
+            self._on_frame_sent()
+            write(data)
+
+        connection.on_message = monitored_on_message
+        connection.write = monitored_write
+
+        # Serial connections create a protocol, which does the framing, for each connection
+        make_protocol = getattr(connection, "make_protocol", None)
+        if make_protocol:
+
+            def monitored_make_protocol() -> Any:
+                protocol = make_protocol()
+                self._watch_framing(protocol)
+                return protocol
+
+            connection.make_protocol = monitored_make_protocol
+
+    def _watch_framing(self, protocol: Any) -> None:
+        data_received = protocol.data_received
+        self._received_bytes = self._framed_bytes = self._discarded_bytes = 0
+
+        def monitored_data_received(data: bytes) -> None:
+            self._received_bytes += len(data)
+            self._metrics.counter(metrics.LINK_RECEIVED_BYTES).inc(len(data))
+            data_received(data)
+
+            # Whatever was consumed without making it into a frame was discarded
+            discarded_bytes = self._received_bytes - len(protocol.buffer) - self._framed_bytes
+            if discarded_bytes > self._discarded_bytes:
+                self._metrics.counter(metrics.LINK_DISCARDED_BYTES).inc(discarded_bytes - self._discarded_bytes)
+                self._discarded_bytes = discarded_bytes
+
+        protocol.data_received = monitored_data_received
+
+    def _on_frame_received(self, frame: bytes) -> None:
+        self._framed_bytes += len(frame)
+        self._metrics.counter(metrics.LINK_RECEIVED_FRAMES).inc()
+
+        # Live events (command 0xE) come unrequested; anything else is taken for the reply to the last request
+        if frame[0] >> 4 != 0xE and self._request_time is not None:
+            self._metrics.histogram(metrics.LINK_ROUND_TRIP).observe(time.perf_counter() - self._request_time)
+            self._request_time = None
+
+    def _on_frame_sent(self) -> None:
+        self._metrics.counter(metrics.LINK_SENT_FRAMES).inc()
+        if self._request_time is not None:
+            self._metrics.counter(metrics.LINK_MISSED_REPLIES).inc()
+
+        self._request_time = time.perf_counter()
@@ -0,0 +1,231 @@
+import bisect
+import os
+import time
+
+from collections.abc import Sequence
+
+
+WINDOW = 60  # number of seconds covered by recent values (rates, averages)
+
+TIME_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30)
+SIZE_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+PROPERTY_CHANGES = "paradox_property_changes_total"
+CHANGE_DISPATCH_TIME = "paradox_change_dispatch_seconds"
+READ_PORTS_FANOUT = "paradox_read_ports_fanout"
+COMMAND_TIME = "paradox_command_seconds"
+COMMAND_FAILURES = "paradox_command_failures_total"
+CONNECTS = "paradox_connects_total"
+CONNECT_FAILURES = "paradox_connect_failures_total"
+CONNECT_TIME = "paradox_connect_seconds"
+SWEEP_TIME = "paradox_sweep_seconds"
+SWEEP_DIFFERENCES = "paradox_sweep_differences"
+CONNECTED = "paradox_connected"
+COMMAND_QUEUE_DEPTH = "paradox_command_queue_depth"
+LINK_RECEIVED_BYTES = "paradox_link_received_bytes_total"
+LINK_DISCARDED_BYTES = "paradox_link_discarded_bytes_total"
+LINK_RECEIVED_FRAMES = "paradox_link_received_frames_total"
+LINK_SENT_FRAMES = "paradox_link_sent_frames_total"
+LINK_MISSED_REPLIES = "paradox_link_missed_replies_total"
+LINK_ROUND_TRIP = "paradox_link_round_trip_seconds"
+SERIAL_BAUD = "paradox_serial_baud"
+ARMING_CONFIRM_TIME = "paradox_arming_confirm_seconds"
+ARMING_FAILURES = "paradox_arming_failures_total"
+
+DESCRIPTIONS = {
+    PROPERTY_CHANGES: "Property changes received from the panel",
+    CHANGE_DISPATCH_TIME: "Time spent handling a property change",
+    READ_PORTS_FANOUT: "Number of ports read when flushing property changes",
+    COMMAND_TIME: "Round trip time of panel commands",
+    COMMAND_FAILURES: "Panel commands that failed or timed out",
+    CONNECTS: "Successful (re)connections to the panel",
+    CONNECT_FAILURES: "Failed connection attempts",
+    CONNECT_TIME: "Time from losing the panel (or starting) until connected",
+    SWEEP_TIME: "Duration of full properties sweeps",
+    SWEEP_DIFFERENCES: "Differences found by full properties sweeps",
+    CONNECTED: "Whether the panel is connected",
+    COMMAND_QUEUE_DEPTH: "Panel commands waiting to be sent",
+    LINK_RECEIVED_BYTES: "Bytes received on the serial link",
+    LINK_DISCARDED_BYTES: "Bytes received on the serial link that were not part of a valid frame",
+    LINK_RECEIVED_FRAMES: "Valid frames received from the panel",
+    LINK_SENT_FRAMES: "Frames sent to the panel",
+    LINK_MISSED_REPLIES: "Requests sent to the panel that were left without reply",
+    LINK_ROUND_TRIP: "Time from sending a request to the panel until receiving its reply",
+    SERIAL_BAUD: "Baud rate of the serial link",
+    ARMING_CONFIRM_TIME: "Time from requesting an area armed mode until the panel reaches it",
+    ARMING_FAILURES: "Area armed mode requests that the panel did not fulfill",
+}
+
+
+type Labels = tuple[tuple[str, str], ...]
+
+
+class RecentWindow:
+    # Count, sum and maximum of values added during the last `WINDOW` seconds, kept in one slot per second
+
+    __slots__ = ("_counts", "_maxima", "_seconds", "_sums")
+
+    def __init__(self) -> None:
+        self._seconds: list[int] = [-1] * WINDOW
+        self._counts: list[int] = [0] * WINDOW
+        self._sums: list[float] = [0] * WINDOW
+        self._maxima: list[float] = [0] * WINDOW
+
+    def add(self, value: float) -> None:
+        second = int(time.monotonic())
+        slot = second % WINDOW
+        if self._seconds[slot] != second:
+            self._seconds[slot] = second
+            self._counts[slot] = 0
+            self._sums[slot] = 0
+            self._maxima[slot] = value
+
+        self._counts[slot] += 1
+        self._sums[slot] += value
+        if value > self._maxima[slot]:
+            self._maxima[slot] = value
+
+    def get_stats(self) -> tuple[int, float, float]:
+        oldest_second = int(time.monotonic()) - WINDOW
+        count = 0
+        sum_ = 0
+        maximum = 0
+        for slot, second in enumerate(self._seconds):
+            if second > oldest_second:
+                count += self._counts[slot]
+                sum_ += self._sums[slot]
+                maximum = max(maximum, self._maxima[slot])
+
+        return count, sum_, maximum
+
+
+class Counter:
+    __slots__ = ("recent", "value")
+
+    def __init__(self) -> None:
+        self.value: float = 0
+        self.recent: RecentWindow = RecentWindow()
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+        self.recent.add(amount)
+
+    def get_rate(self) -> float:
+        # Average increase per second, over the recent window
+        _, sum_, _ = self.recent.get_stats()
+        return sum_ / WINDOW
+
+
+class Histogram:
+    __slots__ = ("bounds", "bucket_counts", "count", "last", "recent", "sum")
+
+    def __init__(self, bounds: Sequence[float]) -> None:
+        self.bounds: Sequence[float] = bounds
+        self.bucket_counts: list[int] = [0] * (len(bounds) + 1)  # the last bucket is unbounded
+        self.count: int = 0
+        self.sum: float = 0
+        self.last: float | None = None
+        self.recent: RecentWindow = RecentWindow()
+
+    def observe(self, value: float) -> None:
+        self.bucket_counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.last = value
+        self.recent.add(value)
+
+    def get_recent_average(self) -> float | None:
+        count, sum_, _ = self.recent.get_stats()
+        return sum_ / count if count else None
+
+    def get_recent_maximum(self) -> float | None:
+        count, _, maximum = self.recent.get_stats()
+        return maximum if count else None
+
+
+class Metrics:
+    # Counters, histograms and gauges of one alarm, rendered in the Prometheus text exposition format
+
+    def __init__(self) -> None:
+        self._counters: dict[tuple[str, Labels], Counter] = {}
+        self._histograms: dict[tuple[str, Labels], Histogram] = {}
+        self._gauges: dict[tuple[str, Labels], float] = {}
+
+    def counter(self, name: str, **labels: str) -> Counter:
+        key = (name, tuple(labels.items()))
+        counter = self._counters.get(key)
+        if counter is None:
+            counter = self._counters[key] = Counter()
+
+        return counter
+
+    def histogram(self, name: str, bounds: Sequence[float] = TIME_BUCKETS, **labels: str) -> Histogram:
+        key = (name, tuple(labels.items()))
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            histogram = self._histograms[key] = Histogram(bounds)
+
+        return histogram
+
+    def set_gauge(self, name: str, value: float, **labels: str) -> None:
+        self._gauges[(name, tuple(labels.items()))] = value
+
+    def get_counters(self, name: str) -> list[Counter]:
+        return [counter for (n, _), counter in self._counters.items() if n == name]
+
+    def get_histograms(self, name: str) -> list[Histogram]:
+        return [histogram for (n, _), histogram in self._histograms.items() if n == name]
+
+    def render(self, **labels: str) -> str:
+        # Given labels are added to all metrics
+        common_labels = tuple(labels.items())
+        lines = []
+        last_name = None
+
+        def add_header(name: str, type_: str) -> None:
+            nonlocal last_name
+            if name != last_name:
+                lines.append(f"# HELP {name} {DESCRIPTIONS.get(name, name)}")
+                lines.append(f"# TYPE {name} {type_}")
+                last_name = name
+
+        for (name, metric_labels), counter in sorted(self._counters.items()):
+            add_header(name, "counter")
+            lines.append(f"{name}{_format_labels(common_labels + metric_labels)} {counter.value:g}")
+
+        for (name, metric_labels), value in sorted(self._gauges.items()):
+            add_header(name, "gauge")
+            lines.append(f"{name}{_format_labels(common_labels + metric_labels)} {value:g}")
+
+        for (name, metric_labels), histogram in sorted(self._histograms.items()):
+            add_header(name, "histogram")
+            metric_labels = common_labels + metric_labels
+            cumulative_count = 0
+            for bound, count in zip((*histogram.bounds, "+Inf"), histogram.bucket_counts, strict=True):
+                cumulative_count += count
+                bucket_labels = (*metric_labels, ("le", bound if isinstance(bound, str) else f"{bound:g}"))
+                lines.append(f"{name}_bucket{_format_labels(bucket_labels)} {cumulative_count}")
+            lines.append(f"{name}_sum{_format_labels(metric_labels)} {histogram.sum:g}")
+            lines.append(f"{name}_count{_format_labels(metric_labels)} {histogram.count}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+
+    return "{" + ",".join(f'{name}="{_escape_label_value(value)}"' for name, value in labels) + "}"
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def save(path: str, text: str) -> None:
+    # Write to a temporary file first, so that scrapers never read a partially written file
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w") as f:
+        f.write(text)
+
+    os.replace(temp_path, path)
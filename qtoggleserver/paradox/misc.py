@@ -1,8 +1,10 @@
 from abc import ABCMeta
+from collections.abc import Iterable
 
 from qtoggleserver.core.typing import NullablePortValue
 
 from .paradoxport import ParadoxPort
+from .typing import PropertyKey
 
 
 class NowAlarmZone(ParadoxPort, metaclass=ABCMeta):
@@ -10,16 +12,14 @@ class NowAlarmZone(ParadoxPort, metaclass=ABCMeta):
     WRITABLE = False
     ID = "now_alarm_zone"
 
+    def get_property_keys(self) -> Iterable[PropertyKey]:
+        return [("zone", None, "alarm")]
+
     async def attr_get_default_display_name(self) -> str:
         return "Now In Alarm Zone"
 
     async def read_value(self) -> NullablePortValue:
-        paradox_alarm = self.get_peripheral()
-        for zone in paradox_alarm.get_zones():
-            if paradox_alarm.get_property("zone", 1, "alarm"):
-                return zone
-
-        return 0
+        return self.get_peripheral().get_now_alarm_zone()
 
 
 class WasAlarmZone(ParadoxPort, metaclass=ABCMeta):
@@ -27,13 +27,11 @@ class WasAlarmZone(ParadoxPort, metaclass=ABCMeta):
     WRITABLE = False
     ID = "was_alarm_zone"
 
+    def get_property_keys(self) -> Iterable[PropertyKey]:
+        return [("zone", None, "was_in_alarm")]
+
     async def attr_get_default_display_name(self) -> str:
         return "Was In Alarm Zone"
 
     async def read_value(self) -> NullablePortValue:
-        paradox_alarm = self.get_peripheral()
-        for zone in paradox_alarm.get_zones():
-            if paradox_alarm.get_property("zone", zone, "was_in_alarm"):
-                return zone
-
-        return 0
+        return self.get_peripheral().get_was_alarm_zone()
@@ -1,9 +1,13 @@
 from abc import ABCMeta
+from collections.abc import Iterable
 
-from qtoggleserver.core.typing import NullablePortValue
+from qtoggleserver.core.typing import NullablePortValue, PortValue
 
+from . import constants
 from .paradoxport import ParadoxPort
-from .typing import Property
+from .store import PropertyCell
+from .timers import Timer
+from .typing import Property, PropertyKey
 
 
 class OutputPort(ParadoxPort, metaclass=ABCMeta):
@@ -18,6 +22,9 @@ class OutputPort(ParadoxPort, metaclass=ABCMeta):
     def get_output_label(self) -> str:
         return self.get_property("label") or f"Output {self.output}"
 
+    def get_property_cell(self, name: str) -> PropertyCell:
+        return self.get_peripheral().get_property_cell("pgm", self.output, name)
+
     def get_property(self, name: str) -> Property:
         return self.get_peripheral().get_property("pgm", self.output, name)
 
@@ -31,26 +38,110 @@ class OutputTroublePort(OutputPort):
 
     ID = "trouble"
 
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+
+        self._trouble_count_cell: PropertyCell = self.get_peripheral().get_trouble_cell("pgm", self.output)
+
+    def get_property_keys(self) -> Iterable[PropertyKey]:
+        return [("pgm", self.output, None)]
+
     async def attr_get_default_display_name(self) -> str:
         return f"{self.get_output_label()} Trouble"
 
     async def read_value(self) -> NullablePortValue:
-        for name, value in self.get_properties().items():
-            if name.endswith("_trouble") and value:
-                return True
+        return self._trouble_count_cell.value > 0
+
+
+class OutputOnPort(OutputPort):
+    TYPE = "boolean"
+    WRITABLE = True
+
+    ID = "on"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+
+        self._on_cell: PropertyCell = self.get_property_cell("on")
+
+    def get_property_keys(self) -> Iterable[PropertyKey]:
+        return [("pgm", self.output, "on")]
+
+    async def attr_get_default_display_name(self) -> str:
+        return self.get_output_label()
+
+    async def read_value(self) -> NullablePortValue:
+        return self._on_cell.value
 
-        return False
+    async def write_value(self, value: PortValue) -> None:
+        # The new value is confirmed by the panel reporting the change; a failed command rolls it back
+        action = constants.PGM_ACTION_ON if value else constants.PGM_ACTION_OFF
+        try:
+            await self.get_peripheral().set_output_action(self.output, action)
+        except Exception:
+            self.push_value()
+            raise
+
+
+class OutputPulsePort(OutputPort):
+    TYPE = "boolean"
+    WRITABLE = True
+
+    ID = "pulse"
+
+    def __init__(self, duration: int, *args, **kwargs) -> None:
+        self.duration: int = duration
+
+        self._pulse_timer: Timer | None = None
+
+        super().__init__(*args, **kwargs)
+
+    async def attr_get_default_display_name(self) -> str:
+        return f"{self.get_output_label()} Pulse"
+
+    async def read_value(self) -> NullablePortValue:
+        return self._pulse_timer is not None
+
+    async def write_value(self, value: PortValue) -> None:
+        # Pulses are timed locally, rather than by PAI, which holds up all other panel commands for their duration (and
+        # doesn't support pulses on EVO panels); writing `true` while pulsing extends the pulse
+        peripheral = self.get_peripheral()
+        if value:
+            if self._pulse_timer:
+                self._pulse_timer.cancel()
+            else:
+                await peripheral.set_output_action(self.output, constants.PGM_ACTION_ON)
+            self._pulse_timer = peripheral.call_later(self.duration / 1000, self._end_pulse)
+        elif self._pulse_timer:
+            self._pulse_timer.cancel()
+            self._pulse_timer = None
+            await peripheral.set_output_action(self.output, constants.PGM_ACTION_OFF)
+
+        self.push_value()
+
+    def _end_pulse(self) -> None:
+        self.debug("pulse ended")
+        self._pulse_timer = None
+        self.push_value()
+        self.get_peripheral().set_output_action_fire_and_forget(self.output, constants.PGM_ACTION_OFF)
 
 
 class OutputTamperPort(OutputPort):
-    # TODO: this should actually be an output port
     TYPE = "boolean"
     WRITABLE = False
 
     ID = "tamper"
 
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+
+        self._tamper_cell: PropertyCell = self.get_property_cell("tamper")
+
+    def get_property_keys(self) -> Iterable[PropertyKey]:
+        return [("pgm", self.output, "tamper")]
+
     async def attr_get_default_display_name(self) -> str:
         return f"{self.get_output_label()} Tamper"
 
     async def read_value(self) -> NullablePortValue:
-        return self.get_property("tamper")
+        return self._tamper_cell.value
@@ -0,0 +1,57 @@
+import logging
+
+from typing import Any
+
+from paradox.config import Config, config
+from paradox.data.enums import RunState
+from paradox.lib import encodings, ps
+from paradox.paradox import Paradox
+
+from . import routing
+
+
+# PAI is only imported through this module, which is itself imported lazily, on first connect: importing PAI takes
+# longer than the rest of the peripheral altogether, and isn't needed by alarms that are disabled or never connect.
+
+__all__ = ["Paradox", "RunState", "ps", "setup"]
+
+_setup_done: bool = False
+
+
+class ScopedConfig(Config):
+    # PAI config whose settings can be overridden by the alarm on whose behalf they are read (see `routing`)
+
+    def __getattribute__(self, name: str) -> Any:
+        alarm = routing.get_current_alarm()
+        if alarm is not None:
+            overrides = alarm.get_paradox_config()
+            if name in overrides:
+                return overrides[name]
+
+        return super().__getattribute__(name)
+
+
+def setup() -> None:
+    # Prepare the process-wide PAI state, shared by all alarms; done once per process
+    global _setup_done
+
+    if _setup_done:
+        return
+
+    config.CONFIG_LOADED = True
+    for k, v in config.DEFAULTS.items():
+        if isinstance(v, tuple):
+            v = v[0]
+
+        setattr(config, k, v)
+
+    config.SYNC_TIME = True
+    config.__class__ = ScopedConfig
+    encodings.register_encodings()
+    ps.subscribe(routing.dispatch_change, "changes")
+
+    logging.getLogger("PAI").setLevel(logging.ERROR)
+    logging.getLogger("PAI.paradox.lib.async_message_manager").setLevel(logging.CRITICAL)
+    logging.getLogger("PAI.paradox.lib.handlers").setLevel(logging.CRITICAL)
+
+    _setup_done = True
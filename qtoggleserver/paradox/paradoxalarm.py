@@ -1,20 +1,28 @@
 import asyncio
 import logging
+import time
 
-from collections.abc import Iterator, Mapping
-from types import MappingProxyType, SimpleNamespace
-from typing import Any, cast
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any
 
 from qtoggleserver.core import main as core_main
 from qtoggleserver.peripherals import Peripheral
-from qtoggleserver.utils import json as json_utils
 
-from paradox.config import config
-from paradox.lib import encodings, ps
-from paradox.paradox import Paradox
+from . import capture, commands, constants, exceptions, metrics, routing, snapshot
+from .backoff import Backoff
+from .journal import Journal
+from .link import LinkMonitor, probe_serial
+from .store import PropertyCell, PropertyStore, StateSnapshot
+from .timers import Timer, TimerScheduler
+from .tracing import ChangeTrace, LazyJSON
+from .typing import Property, PropertyKey
 
-from . import constants, exceptions
-from .typing import Property
+
+if TYPE_CHECKING:
+    from paradox.paradox import Paradox
+
+    from .paradoxport import ParadoxPort
 
 
 class ParadoxAlarm(Peripheral):
@@ -31,120 +39,433 @@ class ParadoxAlarm(Peripheral):
         remotes: list[int] | None = None,
         remote_buttons: dict[str, str] | None = None,
         remote_buttons_timeout: int = constants.DEFAULT_REMOTE_BUTTONS_TIMEOUT,
+        output_pulse_duration: int = constants.DEFAULT_OUTPUT_PULSE_DURATION,
+        arming_timeout: int = constants.DEFAULT_ARMING_TIMEOUT,
+        change_batch_window: int = constants.DEFAULT_CHANGE_BATCH_WINDOW,
+        properties_sweep_interval: int = constants.DEFAULT_PROPERTIES_SWEEP_INTERVAL,
+        change_trace_size: int = 0,
+        command_batch_window: int = constants.DEFAULT_COMMAND_BATCH_WINDOW,
+        command_timeout: int = constants.DEFAULT_COMMAND_TIMEOUT,
+        reconnect_min_delay: int = constants.DEFAULT_RECONNECT_MIN_DELAY,
+        reconnect_max_delay: int = constants.DEFAULT_RECONNECT_MAX_DELAY,
+        snapshot_file: str | None = None,
+        load_configured_only: bool = False,
+        metrics_ports: bool = False,
+        metrics_file: str | None = None,
+        journal_file: str | None = None,
+        journal_size: int = constants.DEFAULT_JOURNAL_SIZE,
+        capture_file: str | None = None,
+        capture_size: int = constants.DEFAULT_CAPTURE_SIZE,
         serial_port: str | None = None,
-        serial_baud: int = constants.DEFAULT_SERIAL_BAUD,
+        serial_baud: int | str = constants.DEFAULT_SERIAL_BAUD,
         ip_host: str | None = None,
         ip_port: int = constants.DEFAULT_IP_PORT,
         ip_password: str = constants.DEFAULT_IP_PASSWORD,
         panel_password: str = constants.DEFAULT_PANEL_PASSWORD,
         **kwargs,
     ) -> None:
-        self.setup_config()
-        self.setup_logging()
-
         self._areas: list[int] = areas or []
         self._zones: list[int] = zones or []
+        self._zones_set: set[int] = set(self._zones)
         self._outputs: list[int] = outputs or []
         self._remotes: list[int] = remotes or []
         self._remote_buttons: dict[int, str] = {int(k): v for k, v in (remote_buttons or {}).items()}
         self._remote_buttons_timeout: int = remote_buttons_timeout
+        self._output_pulse_duration: int = output_pulse_duration
+        self._arming_timeout: int = arming_timeout
+        self._change_batch_window: int = change_batch_window
+        self._properties_sweep_interval: int = properties_sweep_interval
+        self._change_trace: ChangeTrace | None = ChangeTrace(change_trace_size) if change_trace_size > 0 else None
 
         self._serial_port: str | None = serial_port
-        self._serial_baud: int = serial_baud
+        self._serial_auto_baud: bool = serial_baud == constants.SERIAL_BAUD_AUTO
+        self._serial_baud: int | None = None if self._serial_auto_baud else int(serial_baud)  # `None` until detected
         self._ip_host: str | None = ip_host
         self._ip_port: int = ip_port
         self._ip_password: str = ip_password
         self._panel_password: str = panel_password
+        self._load_configured_only: bool = load_configured_only
+
+        self._paradox_config: dict[str, Any] = self.make_paradox_config()
 
         self._paradox = None
+        self._paradox_synced: bool = False  # whether panel memory (labels, definitions) was loaded into `_paradox`
         self._panel_task = None
-        self._supervisor_task = asyncio.create_task(self._supervisor_loop())
+        self._connection_state: str = constants.CONNECTION_STATE_DISCONNECTED
+        self._reconnect_backoff: Backoff = Backoff(reconnect_min_delay / 1000, reconnect_max_delay / 1000)
+        self._reconnect_start_time: float | None = None
+        self._reconnect_count: int = 0
+        self._last_reconnect_duration: float | None = None
+        self._supervisor_wakeup: asyncio.Event = asyncio.Event()
+        self._supervisor_task = routing.create_task(self, self._supervisor_loop())
+
+        routing.register(self)
+
+        self._store: PropertyStore = PropertyStore()
+        self._alarm_zones: dict[int, None] = {}  # ordered set of zones in alarm
+        self._was_alarm_zones: dict[int, None] = {}  # ordered set of zones that were in alarm
+        self._port_subscriptions: dict[PropertyKey, list[ParadoxPort]] = {}
+        self._pending_changes: dict[PropertyKey, tuple[Property | None, Property | None]] = {}
+        self._flush_changes_task: asyncio.Task | None = None
+        self._dirty_entries: set[tuple[str, str | int]] = set()
+        self._timers: TimerScheduler = TimerScheduler()
+        self._read_ports_tasks: set[asyncio.Task] = set()
+        self._command_tasks: set[asyncio.Task] = set()
+        self._command_scheduler: commands.CommandScheduler = commands.CommandScheduler(
+            command_timeout, self._send_command
+        )
+        self._commands: commands.CommandCoalescer = commands.CommandCoalescer(
+            command_batch_window, self._command_scheduler.execute
+        )
+        self._last_properties_sweep_time: float = 0
+        self._snapshot_file: str | None = snapshot_file
+        self._snapshot_dirty: bool = False
+        self._stale_properties: set[PropertyKey] = set()
+        # Number of stale properties by wildcard key, i.e. `(type, id, None)`, `(type, None, name)` and
+        # `(type, None, None)`, so that wildcard lookups don't have to go through all stale properties
+        self._stale_wildcard_counts: dict[PropertyKey, int] = {}
+        self._metrics: metrics.Metrics = metrics.Metrics()
+        self._metrics_ports: bool = metrics_ports
+        self._metrics_file: str | None = metrics_file
+        self._journal_file: str | None = journal_file
+        self._journal_size: int = journal_size
+        self._journal: Journal | None = None
+        self._capture_file: str | None = capture_file
+        self._capture_size: int = capture_size
+        self._capture: capture.CaptureWriter | None = None
+        self._link_monitor: LinkMonitor = LinkMonitor(self._metrics)
 
-        ps.subscribe(self.handle_paradox_property_change, "changes")
+        super().__init__(**kwargs)
 
-        self._properties = {}
+        if self._snapshot_file:
+            self.restore_snapshot()
+        if self._journal_file:
+            self.open_journal()
+        if self._capture_file:
+            self.open_capture()
 
-        super().__init__(**kwargs)
+    def make_paradox_config(self) -> dict[str, Any]:
+        # PAI settings specific to this alarm; they override the process-wide PAI config whenever PAI works on behalf
+        # of this alarm (see `routing`)
+        if self._serial_port:
+            paradox_config = {
+                "CONNECTION_TYPE": "Serial",
+                "SERIAL_PORT": self._serial_port,
+                "SERIAL_BAUD": self._serial_baud or constants.DEFAULT_SERIAL_BAUD,
+                "IO_TIMEOUT": 10,
+            }
+        else:  # IP connection, e.g. 192.168.1.2:10000:paradox
+            paradox_config = {
+                "CONNECTION_TYPE": "IP",
+                "IP_CONNECTION_HOST": self._ip_host,
+                "IP_CONNECTION_PORT": self._ip_port,
+                "IP_CONNECTION_PASSWORD": self._ip_password.encode(),
+                "IP_INTERFACE_PASSWORD": self._ip_password.encode(),
+            }
+
+        paradox_config["PASSWORD"] = self._panel_password.encode()
+
+        # Each alarm needs its own limits, as PAI narrows them down to the enabled entities while loading definitions.
+        # Limits restrict loaded labels as well as reported statuses to the given ids.
+        limits = {}
+        if self._load_configured_only:
+            limits = {
+                "partition": list(self._areas),
+                "zone": list(self._zones),
+                "pgm": list(self._outputs),
+                "user": [remote for remote in self._remotes if remote],
+            }
+        paradox_config["LIMITS"] = limits
+
+        return paradox_config
+
+    def get_paradox_config(self) -> Mapping[str, Any]:
+        return self._paradox_config
 
-    @staticmethod
-    def setup_config() -> None:
-        config.CONFIG_LOADED = True
-        for k, v in config.DEFAULTS.items():
-            if isinstance(v, tuple):
-                v = v[0]
+    def make_paradox(self) -> Paradox:
+        from .pai import Paradox
 
-            setattr(config, k, v)
+        if self._serial_port:
+            self.debug("using serial connection on %s:%s", self._serial_port, self._serial_baud)
+        else:
+            self.debug("using IP connection on %s:%s", self._ip_host, self._ip_port)
 
-        config.SYNC_TIME = True
-        encodings.register_encodings()
+        paradox = Paradox()
+        routing.attach(self, paradox)
+        self._link_monitor.attach(paradox.connection)
+        if self._capture:
+            self._capture.attach(paradox.connection)
 
-    @staticmethod
-    def setup_logging() -> None:
-        logging.getLogger("PAI").setLevel(logging.ERROR)
-        logging.getLogger("PAI.paradox.lib.async_message_manager").setLevel(logging.CRITICAL)
-        logging.getLogger("PAI.paradox.lib.handlers").setLevel(logging.CRITICAL)
+        return paradox
 
-    def make_paradox(self) -> Paradox:
-        if self._serial_port:
-            config.CONNECTION_TYPE = "Serial"
-            config.SERIAL_PORT = self._serial_port
-            config.SERIAL_BAUD = self._serial_baud
-            config.IO_TIMEOUT = 10
-            config.LOGGING_DUMP_PACKETS = True
-            config.LOGGING_DUMP_MESSAGES = True
-
-            self.debug("using serial connection on %s:%s", config.SERIAL_PORT, config.SERIAL_BAUD)
-        else:  # IP connection, e.g. 192.168.1.2:10000:paradox
-            config.CONNECTION_TYPE = "IP"
-            config.IP_CONNECTION_HOST = self._ip_host
-            config.IP_CONNECTION_PORT = self._ip_port
-            config.IP_CONNECTION_PASSWORD = self._ip_password.encode()
-            config.IP_INTERFACE_PASSWORD = self._ip_password.encode()
+    def restore_snapshot(self) -> None:
+        # Restore labels and last known property values, so that ports are usable right away; restored properties are
+        # considered stale until confirmed by the panel
+        try:
+            properties = snapshot.load(self._snapshot_file)
+        except Exception as e:
+            self.error("failed to load snapshot from %s: %s", self._snapshot_file, e, exc_info=True)
+            return
+
+        if not properties:
+            return
 
-            self.debug("using IP connection on %s:%s", config.IP_CONNECTION_HOST, config.IP_CONNECTION_PORT)
+        for type_, entries in properties.items():
+            for id_, entry_properties in entries.items():
+                id_ = id_ or None  # entities without id (i.e. system) are stored with id 0
+                for name, value in entry_properties.items():
+                    self._store.set(type_, id_, name, value)
+                    self._add_stale_property(type_, id_, name)
+
+                    if type_ == "zone" and id_ in self._zones_set:
+                        if name == "alarm":
+                            self._update_ordered_set(self._alarm_zones, id_, bool(value))
+                        elif name == "was_in_alarm":
+                            self._update_ordered_set(self._was_alarm_zones, id_, bool(value))
+
+        self.debug("restored %d properties from %s", len(self._stale_properties), self._snapshot_file)
+
+    async def save_snapshot(self) -> None:
+        self._snapshot_dirty = False
+        try:
+            await asyncio.to_thread(snapshot.save, self._snapshot_file, self._store.dump())
+        except Exception as e:
+            self.error("failed to save snapshot to %s: %s", self._snapshot_file, e, exc_info=True)
+
+    def open_journal(self) -> None:
+        try:
+            self._journal = Journal(self._journal_file, self._journal_size * 1024)
+        except Exception as e:
+            self.error("failed to open journal %s: %s", self._journal_file, e, exc_info=True)
+            return
+
+        self.debug("opened journal %s with %d records", self._journal_file, self._journal.get_count())
+
+    async def flush_journal(self) -> None:
+        try:
+            await asyncio.to_thread(self._journal.flush)
+        except Exception as e:
+            self.error("failed to flush journal %s: %s", self._journal_file, e, exc_info=True)
+
+    def query_journal(
+        self,
+        type_: str | None = None,
+        id_: int | None = None,
+        name: str | None = None,
+        since: float | None = None,
+        until: float | None = None,
+        limit: int | None = None,
+    ) -> list[dict[str, Any]]:
+        # Return journaled property changes, oldest first, optionally filtered by entity, property and time (as UNIX
+        # timestamps); e.g. `query_journal("zone", 3, "alarm", limit=10)` returns the last 10 alarm changes of zone 3.
+        # Values that couldn't be recorded are returned as `journal.UNKNOWN`.
+        if not self._journal:
+            return []
+
+        return self._journal.query(type_, id_, name, since, until, limit)
+
+    def open_capture(self) -> None:
+        try:
+            self._capture = capture.CaptureWriter(self._capture_file, self._capture_size * 1024)
+        except Exception as e:
+            self.error("failed to open capture file %s: %s", self._capture_file, e, exc_info=True)
+            return
+
+        self.debug("capturing panel frames to %s", self._capture_file)
+
+    def get_metrics(self) -> metrics.Metrics:
+        return self._metrics
+
+    def get_metrics_text(self) -> str:
+        self._metrics.set_gauge(metrics.CONNECTED, int(self.is_panel_connected()))
+        self._metrics.set_gauge(metrics.COMMAND_QUEUE_DEPTH, self._command_scheduler.get_stats()["queue_depth"])
+        if self._serial_baud:
+            self._metrics.set_gauge(metrics.SERIAL_BAUD, self._serial_baud)
+
+        return self._metrics.render(alarm=self.get_id())
+
+    async def save_metrics(self) -> None:
+        try:
+            await asyncio.to_thread(metrics.save, self._metrics_file, self.get_metrics_text())
+        except Exception as e:
+            self.error("failed to save metrics to %s: %s", self._metrics_file, e, exc_info=True)
 
-        config.PASSWORD = self._panel_password.encode()
+    def is_property_stale(self, type_: str, id_: int | None, name: str | None) -> bool:
+        # `None` acts as wildcard for `id_` and `name`
+        if not self._stale_properties:
+            return False
 
-        return Paradox()
+        if id_ is not None and name is not None:
+            return (type_, id_, name) in self._stale_properties
+
+        return (type_, id_, name) in self._stale_wildcard_counts
+
+    def _add_stale_property(self, type_: str, id_: int | None, name: str) -> None:
+        key = type_, id_, name
+        if key in self._stale_properties:
+            return
+
+        self._stale_properties.add(key)
+        for wildcard_key in self._get_stale_wildcard_keys(type_, id_, name):
+            self._stale_wildcard_counts[wildcard_key] = self._stale_wildcard_counts.get(wildcard_key, 0) + 1
+
+    def _confirm_property(self, type_: str, id_: int | None, name: str) -> None:
+        key = type_, id_, name
+        if key not in self._stale_properties:
+            return
+
+        self._stale_properties.discard(key)
+        for wildcard_key in self._get_stale_wildcard_keys(type_, id_, name):
+            count = self._stale_wildcard_counts[wildcard_key] - 1
+            if count:
+                self._stale_wildcard_counts[wildcard_key] = count
+            else:
+                del self._stale_wildcard_counts[wildcard_key]
+
+        for port in self.get_subscribed_ports(type_, id_, name):
+            port.update_stale()
+
+    @staticmethod
+    def _get_stale_wildcard_keys(type_: str, id_: int | None, name: str) -> set[PropertyKey]:
+        # A set, since keys coincide for properties of entities without id
+        return {(type_, id_, None), (type_, None, name), (type_, None, None)}
 
     def parse_labels(self) -> None:
-        for area in self._paradox.storage.data["partition"].values():
-            self.debug("detected area id=%s, label=%s", area["id"], json_utils.dumps(area["label"]))
+        if self.is_log_enabled(logging.DEBUG):
+            for area in self._paradox.storage.data["partition"].values():
+                self.debug("detected area id=%s, label=%s", area["id"], LazyJSON(area["label"]))
 
-        for zone in self._paradox.storage.data["zone"].values():
-            self.debug("detected zone id=%s, label=%s", zone["id"], json_utils.dumps(zone["label"]))
+            for zone in self._paradox.storage.data["zone"].values():
+                self.debug("detected zone id=%s, label=%s", zone["id"], LazyJSON(zone["label"]))
 
-        for output in self._paradox.storage.data["pgm"].values():
-            self.debug("detected output id=%s, label=%s", output["id"], json_utils.dumps(output["label"]))
+            for output in self._paradox.storage.data["pgm"].values():
+                self.debug("detected output id=%s, label=%s", output["id"], LazyJSON(output["label"]))
 
         for type_, entries in self._paradox.storage.data.items():
             for entry in entries.values():
                 if "label" in entry:
-                    self._properties.setdefault(type_, {}).setdefault(entry["id"], {})["label"] = entry["label"]
+                    self._store.set(type_, entry["id"], "label", entry["label"])
+                    if self._stale_properties:
+                        self._confirm_property(type_, entry["id"], "label")
 
-    async def connect(self) -> None:
-        self.debug("connecting to panel")
+        self._snapshot_dirty = True
 
-        if not self._paradox:
+    async def connect(self) -> None:
+        # Establishing the link and authenticating the session are done in one go by PAI; they are told apart after
+        # the fact, by looking at the link. A PAI instance whose memory was already loaded is reused after a link
+        # failure, skipping the (slow) memory loading once the session is restored.
+        from . import pai
+
+        pai.setup()
+
+        resume = self._paradox is not None and self._paradox_synced
+        if resume and self._serial_auto_baud and not self._serial_baud:
+            # The last attempt failed, possibly because the panel was set to another baud rate meanwhile; the connection
+            # of the PAI instance is bound to the baud rate it was made with, so it's only reused if that still works
+            baud = self._paradox_config["SERIAL_BAUD"]
+            await self.detect_serial_baud()
+            if self._serial_baud not in (None, baud):
+                resume = False
+
+        if resume:
+            self.debug("reconnecting to panel")
+        else:
+            self.debug("connecting to panel")
+            if self._paradox:
+                await self._discard_paradox()
+            if self._serial_auto_baud and not self._serial_baud:
+                await self.detect_serial_baud()
             self._paradox = self.make_paradox()
 
-        if not await self._paradox.full_connect():
+        self._set_connection_state(constants.CONNECTION_STATE_CONNECTING)
+        if self._capture:
+            self._capture.record(capture.SESSION_START)
+        if not await self._paradox.connect():
+            if self._paradox.connection.connected:
+                # Link is up but the panel refused the session; start over with a fresh PAI instance
+                self._set_connection_state(constants.CONNECTION_STATE_LINK_UP)
+                await self._discard_paradox()
+            elif not resume:
+                await self._discard_paradox()
+
+            if self._serial_auto_baud:
+                self._serial_baud = None  # the panel may have been set to another baud rate meanwhile
+
             raise exceptions.ParadoxConnectError()
 
+        self._set_connection_state(constants.CONNECTION_STATE_AUTHENTICATED)
+        if not resume:
+            try:
+                await self._paradox.panel.load_memory()
+            except (TimeoutError, ConnectionError) as e:
+                self.error("failed to load panel memory: %s", e)
+                await self._discard_paradox()
+                raise exceptions.ParadoxConnectError() from e
+
+            self._paradox_synced = True
+
+        self._paradox.run_state = pai.RunState.RUN
+        self._paradox.request_status_refresh()
+
         self.debug("connected to panel")
         await self.handle_connected()
 
+    async def detect_serial_baud(self) -> None:
+        # Try supported baud rates, fastest first, settling on the first one at which the panel replies
+        for baud in constants.SERIAL_BAUD_RATES:
+            try:
+                round_trip_time = await probe_serial(self._serial_port, baud, constants.SERIAL_PROBE_TIMEOUT)
+            except Exception as e:
+                self.error("failed to probe serial port %s at %s baud: %s", self._serial_port, baud, e)
+                raise exceptions.ParadoxConnectError() from e
+
+            if round_trip_time is not None:
+                self.debug("panel replied at %s baud in %.1f ms", baud, round_trip_time * 1000)
+                self._serial_baud = baud
+                self._paradox_config["SERIAL_BAUD"] = baud
+                return
+
+            self.debug("no reply from panel at %s baud", baud)
+
+        self.error("panel replied at none of the supported baud rates")
+        raise exceptions.ParadoxConnectError()
+
     async def make_port_args(self) -> list[dict[str, Any]]:
         from .area import AreaAlarmPort, AreaArmedPort
         from .misc import NowAlarmZone, WasAlarmZone
-        from .output import OutputTamperPort, OutputTroublePort
+        from .output import OutputOnPort, OutputPulsePort, OutputTamperPort, OutputTroublePort
+        from .performance import (
+            ArmingConfirmTimePort,
+            ChangeRatePort,
+            CommandTimePort,
+            ConnectTimePort,
+            DispatchTimePort,
+            LinkErrorRatePort,
+            LinkRoundTripPort,
+            ReadFanoutPort,
+            ReconnectCountPort,
+            SweepDifferencesPort,
+            SweepTimePort,
+        )
         from .remote import AnyRemoteButtonPort, RemoteButtonPort
         from .system import SystemTroublePort
-        from .zone import ZoneAlarmPort, ZoneOpenPort, ZoneTamperPort, ZoneTroublePort, ZoneWasInAlarmPort
+        from .zone import (
+            ZoneAlarmPort,
+            ZoneBypassPort,
+            ZoneOpenPort,
+            ZoneTamperPort,
+            ZoneTroublePort,
+            ZoneWasInAlarmPort,
+        )
 
         port_args = []
         port_args += [{"driver": AreaAlarmPort, "area": area} for area in self._areas]
-        port_args += [{"driver": AreaArmedPort, "area": area} for area in self._areas]
+        port_args += [{"driver": AreaArmedPort, "area": area, "timeout": self._arming_timeout} for area in self._areas]
+        port_args += [{"driver": OutputOnPort, "output": output} for output in self._outputs]
+        port_args += [
+            {"driver": OutputPulsePort, "output": output, "duration": self._output_pulse_duration}
+            for output in self._outputs
+        ]
         port_args += [{"driver": OutputTamperPort, "output": output} for output in self._outputs]
         port_args += [{"driver": OutputTroublePort, "output": output} for output in self._outputs]
         port_args += [{"driver": ZoneAlarmPort, "zone": zone} for zone in self._zones]
@@ -152,10 +473,24 @@ class ParadoxAlarm(Peripheral):
         port_args += [{"driver": ZoneOpenPort, "zone": zone} for zone in self._zones]
         port_args += [{"driver": ZoneTamperPort, "zone": zone} for zone in self._zones]
         port_args += [{"driver": ZoneTroublePort, "zone": zone} for zone in self._zones]
+        port_args += [{"driver": ZoneBypassPort, "zone": zone} for zone in self._zones]
         port_args += [{"driver": SystemTroublePort}]
         port_args += [{"driver": WasAlarmZone}]
         port_args += [{"driver": NowAlarmZone}]
 
+        if self._metrics_ports:
+            port_args += [{"driver": ChangeRatePort}]
+            port_args += [{"driver": DispatchTimePort}]
+            port_args += [{"driver": ReadFanoutPort}]
+            port_args += [{"driver": CommandTimePort}]
+            port_args += [{"driver": ReconnectCountPort}]
+            port_args += [{"driver": ConnectTimePort}]
+            port_args += [{"driver": SweepTimePort}]
+            port_args += [{"driver": SweepDifferencesPort}]
+            port_args += [{"driver": LinkRoundTripPort}]
+            port_args += [{"driver": LinkErrorRatePort}]
+            port_args += [{"driver": ArmingConfirmTimePort}]
+
         for remote in self._remotes:
             for button in self._remote_buttons.get(remote, []):
                 port_args.append(
@@ -182,12 +517,41 @@ class ParadoxAlarm(Peripheral):
 
     async def handle_connected(self) -> None:
         self._panel_task = asyncio.create_task(self._paradox.loop())
+        self._panel_task.add_done_callback(lambda _: self._supervisor_wakeup.set())
+        self._watch_connection_loss()
+        self._set_connection_state(constants.CONNECTION_STATE_RUNNING)
 
         self.parse_labels()
+        self._last_properties_sweep_time = 0  # have properties swept right after connecting
         await self.trigger_port_update()
 
+    def _watch_connection_loss(self) -> None:
+        # Have the supervisor woken up as soon as the link drops, rather than when PAI notices missing replies
+        connection = self._paradox.connection
+        on_connection_loss = connection.on_connection_loss
+
+        def watched_on_connection_loss() -> None:
+            on_connection_loss()
+            self._supervisor_wakeup.set()
+
+        connection.on_connection_loss = watched_on_connection_loss
+
+    async def _discard_paradox(self) -> None:
+        paradox = self._paradox
+        self._paradox = None
+        self._paradox_synced = False
+        routing.detach(paradox)
+
+        try:
+            await paradox.disconnect()
+        except Exception as e:
+            self.debug("failed to disconnect discarded PAI instance: %s", e)
+
     async def disconnect(self) -> None:
+        self._set_connection_state(constants.CONNECTION_STATE_DISCONNECTED)
         if self._panel_task is None:
+            if self._paradox:
+                await self._discard_paradox()
             return
 
         self.debug("disconnecting")
@@ -197,7 +561,9 @@ class ParadoxAlarm(Peripheral):
             # PAI may raise ConnectionError when disconnecting, so we catch it here and ignore it
             self.error("failed to disconnect from panel: %s", e, exc_info=True)
 
+        routing.detach(self._paradox)
         self._paradox = None
+        self._paradox_synced = False
 
         await self.trigger_port_update()
 
@@ -211,38 +577,119 @@ class ParadoxAlarm(Peripheral):
 
         self._panel_task = None
 
-    async def _supervisor_loop(self) -> None:
-        connect_succeeded = False
-
-        while True:
+    def is_panel_connected(self) -> bool:
+        return (
+            self._connection_state == constants.CONNECTION_STATE_RUNNING
+            and self._paradox is not None
+            and self._paradox.connection.connected
+            and self._panel_task is not None
+            and not self._panel_task.done()
+        )
+
+    def _set_connection_state(self, state: str) -> None:
+        if state != self._connection_state:
+            self.debug("connection state: %s -> %s", self._connection_state, state)
+            self._connection_state = state
+
+    def get_connection_state(self) -> str:
+        return self._connection_state
+
+    def get_connection_stats(self) -> dict[str, Any]:
+        return {
+            "state": self._connection_state,
+            "reconnect_count": self._reconnect_count,
+            "last_reconnect_duration": self._last_reconnect_duration,
+            "failed_attempts": self._reconnect_backoff.get_failures(),
+        }
+
+    async def _handle_connection_lost(self) -> None:
+        self.debug("connection to panel lost")
+        self._reconnect_start_time = time.monotonic()
+        self._set_connection_state(constants.CONNECTION_STATE_DISCONNECTED)
+
+        # Make sure the PAI loop of the lost session is gone before a new session is started
+        if self._panel_task:
+            self._panel_task.cancel()
             try:
-                connected = (
-                    self._paradox
-                    and self._paradox.connection
-                    and self._paradox.connection.connected
-                    and connect_succeeded
-                )
+                await self._panel_task
+            except BaseException:
+                pass
+            self._panel_task = None
 
-                self.set_online(connected)
+        await self.trigger_port_update()
 
-                if self.is_enabled() and not connected:
-                    try:
-                        await self.connect()
-                        connect_succeeded = True
-                    except Exception as e:
-                        self.error("failed to connect: %s", e, exc_info=True)
-                elif not self.is_enabled() and connected:
-                    connect_succeeded = False
+    async def _try_connect(self) -> float | None:
+        # Returns the delay before the next attempt, or `None` if connected
+        if self._reconnect_start_time is None:
+            self._reconnect_start_time = time.monotonic()
+
+        try:
+            await self.connect()
+        except Exception as e:
+            self.error("failed to connect: %s", e, exc_info=not isinstance(e, exceptions.ParadoxConnectError))
+            self._metrics.counter(metrics.CONNECT_FAILURES).inc()
+            if self._connection_state == constants.CONNECTION_STATE_LINK_UP:
+                # Session refused (e.g. wrong password or another client connected); retrying soon won't help and may
+                # lock the panel out
+                delay = self._reconnect_backoff.fail_long()
+            else:
+                delay = self._reconnect_backoff.fail()
+
+            self._set_connection_state(constants.CONNECTION_STATE_DISCONNECTED)
+            self.debug("retrying connection in %.1f seconds", delay)
+
+            return delay
+
+        self._last_reconnect_duration = time.monotonic() - self._reconnect_start_time
+        self._reconnect_start_time = None
+        self._reconnect_count += 1
+        self._reconnect_backoff.reset()
+        self._metrics.counter(metrics.CONNECTS).inc()
+        self._metrics.histogram(metrics.CONNECT_TIME).observe(self._last_reconnect_duration)
+        self.debug("connection took %.2f seconds", self._last_reconnect_duration)
+
+        return None
+
+    async def _supervisor_loop(self) -> None:
+        while True:
+            try:
+                delay = self.SUPERVISOR_LOOP_INTERVAL
+                connected = self.is_panel_connected()
+                enabled = self.is_enabled()
+
+                if enabled and not connected:
+                    if self._connection_state == constants.CONNECTION_STATE_RUNNING:
+                        # Just dropped; retry right away, as short interruptions usually recover immediately
+                        await self._handle_connection_lost()
+
+                    retry_delay = await self._try_connect()
+                    if retry_delay is None:
+                        connected = True
+                    else:
+                        delay = retry_delay
+                elif not enabled and self._connection_state != constants.CONNECTION_STATE_DISCONNECTED:
+                    connected = False
+                    self._reconnect_backoff.reset()
+                    self._reconnect_start_time = None
 
                     try:
                         await self.disconnect()
                     except Exception as e:
                         self.error("failed to disconnect: %s", e, exc_info=True)
 
-                if self._paradox:
+                self.set_online(connected)
+
+                if connected:
                     await self._update_properties()
+                elif self.is_enabled() == enabled:
+                    # Leftover wakeups of a lost session must not cut the delay short, unlike those of enabling or
+                    # disabling the alarm meanwhile
+                    self._supervisor_wakeup.clear()
 
-                await asyncio.sleep(self.SUPERVISOR_LOOP_INTERVAL)
+                if self._metrics_file:
+                    await self.save_metrics()
+
+                await self._wait_supervisor_wakeup(delay)
             except Exception as e:
                 self.error("supervisor loop error: %s", e, exc_info=True)
                 await asyncio.sleep(self.SUPERVISOR_LOOP_INTERVAL)
@@ -250,13 +697,37 @@ class ParadoxAlarm(Peripheral):
                 self.debug("supervisor task cancelled")
                 break
 
-    async def handle_cleanup(self) -> None:
-        await super().handle_cleanup()
+    async def _wait_supervisor_wakeup(self, timeout: float) -> None:
         try:
-            await self.disconnect()
-        except ConnectionError:
-            # We might already be disconnected or not yet connected
+            await asyncio.wait_for(self._supervisor_wakeup.wait(), timeout)
+        except TimeoutError:
             pass
+        finally:
+            self._supervisor_wakeup.clear()
+
+    async def handle_enable(self) -> None:
+        await super().handle_enable()
+        self._supervisor_wakeup.set()  # connect right away, rather than on the next supervisor round
+
+    async def handle_disable(self) -> None:
+        await super().handle_disable()
+        self._supervisor_wakeup.set()
+
+    async def handle_cleanup(self) -> None:
+        await super().handle_cleanup()
+        if self._flush_changes_task:
+            self._flush_changes_task.cancel()
+        self._timers.cancel_all()
+        self._commands.cancel_all()
+        self._command_scheduler.cancel_all()
+        routing.unregister(self)
+        if self._snapshot_file and self._snapshot_dirty:
+            await self.save_snapshot()
+        if self._journal:
+            self._journal.close()
+            self._journal = None
+
+        # Stop supervising first, so that disconnecting isn't taken for a connection loss and followed by a reconnect
         if self._supervisor_task:
             self._supervisor_task.cancel()
             try:
@@ -264,107 +735,251 @@ class ParadoxAlarm(Peripheral):
             except asyncio.CancelledError:
                 pass
 
-    async def handle_paradox_property_change(self, change: Any, update_ports: bool = True) -> None:
-        from .paradoxport import ParadoxPort
+        try:
+            # Disconnect on behalf of this alarm, as cleanup is called from outside its own tasks
+            await routing.create_task(self, self.disconnect())
+        except ConnectionError:
+            # We might already be disconnected or not yet connected
+            pass
 
+        if self._capture:
+            await self._capture.close()
+            self._capture = None
+
+    async def handle_paradox_property_change(self, change: Any) -> None:
         if not self._paradox:
             return
 
+        start_time = time.perf_counter()
+        self._metrics.counter(metrics.PROPERTY_CHANGES, type=change.type).inc()
+
+        # Changes are published by storage as it updates the entry, so it's normally there
         info = self._paradox.storage.data[change.type].get(change.key)
-        if info and ("id" in info):
-            id_ = info["id"]
-            self.debug(
-                "property change: %s[%s].%s: %s -> %s",
-                change.type,
-                id_,
-                change.property,
-                json_utils.dumps(change.old_value, extra_types=json_utils.ExtraTypes.EXTENDED),
-                json_utils.dumps(change.new_value, extra_types=json_utils.ExtraTypes.EXTENDED),
-            )
-            obj = self._properties.setdefault(change.type, {}).setdefault(id_, {})
-            obj[change.property] = change.new_value
-            obj["label"] = info["label"]
-        else:
-            id_ = None
+        if info is not None:
+            await self._apply_property_change(change.type, info, change.property, change.old_value, change.new_value)
+
+        self._metrics.histogram(metrics.CHANGE_DISPATCH_TIME).observe(time.perf_counter() - start_time)
+
+    def handle_paradox_storage_load(self, data: dict[str, dict[Any, Any]]) -> None:
+        # Labels and definitions are merged into storage without change events; have the loaded entries revisited by
+        # the next properties update
+        for type_, entries in data.items():
+            for key in entries:
+                self._dirty_entries.add((type_, key))
+
+    async def _apply_property_change(
+        self, type_: str, info: dict[str, Any], name: str, old_value: Property | None, new_value: Property | None
+    ) -> None:
+        id_ = info.get("id")
+        self._store.set(type_, id_, name, new_value)
+        if id_ is not None:
+            label = info["label"]
+            if self._store.get(type_, id_, "label") != label:
+                self._store.set(type_, id_, "label", label)
+
+        if type_ == "zone" and id_ in self._zones_set:
+            if name == "alarm":
+                self._update_ordered_set(self._alarm_zones, id_, bool(new_value))
+            elif name == "was_in_alarm":
+                self._update_ordered_set(self._was_alarm_zones, id_, bool(new_value))
+
+        self._snapshot_dirty = True
+        if self._stale_properties:
+            self._confirm_property(type_, id_, name)
+        if self._change_trace:
+            self._change_trace.record(type_, id_, name, old_value, new_value)
+        if self._journal:
+            self._journal.append(type_, id_, name, old_value, new_value)
+        if self.is_log_enabled(logging.DEBUG):
             self.debug(
-                "property change: %s.%s: %s -> %s",
-                change.type,
-                change.property,
-                json_utils.dumps(change.old_value, extra_types=json_utils.ExtraTypes.EXTENDED),
-                json_utils.dumps(change.new_value, extra_types=json_utils.ExtraTypes.EXTENDED),
+                "property change: %s[%s].%s: %s -> %s", type_, id_, name, LazyJSON(old_value), LazyJSON(new_value)
             )
-            self._properties.setdefault(change.type, {})[change.property] = change.new_value
 
-        for port in self.get_ports():
-            pai_port = cast(ParadoxPort, port)
+        # Merge changes of the same property within the batch window, keeping the first old value and the last new
+        # value
+        key = (type_, id_, name)
+        pending_change = self._pending_changes.get(key)
+        if pending_change:
+            old_value = pending_change[0]
+        self._pending_changes[key] = old_value, new_value
 
-            try:
-                pai_port.on_property_change(change.type, id_, change.property, change.old_value, change.new_value)
-            except Exception as e:
-                self.error("property change handler execution failed: %s", e, exc_info=True)
+        if self._change_batch_window <= 0:
+            await self.flush_changes()
+        elif not self._flush_changes_task:
+            self._flush_changes_task = asyncio.create_task(self._flush_changes_later())
+
+    async def _flush_changes_later(self) -> None:
+        await asyncio.sleep(self._change_batch_window / 1000)
+
+        try:
+            await self.flush_changes()
+        except Exception as e:
+            self.error("failed to flush property changes: %s", e, exc_info=True)
+
+    async def flush_changes(self) -> None:
+        changes = self._pending_changes
+        self._pending_changes = {}
+        self._flush_changes_task = None
+        self._store.commit()
+
+        ports = {}
+        for (type_, id_, name), (old_value, new_value) in changes.items():
+            for port in self.get_subscribed_ports(type_, id_, name):
+                port.invalidate_value()
+                try:
+                    port.on_property_change(type_, id_, name, old_value, new_value)
+                except Exception as e:
+                    self.error("property change handler execution failed: %s", e, exc_info=True)
+
+                ports[port] = True
+
+        if ports:
+            self._metrics.histogram(metrics.READ_PORTS_FANOUT, metrics.SIZE_BUCKETS).observe(len(ports))
+            await core_main.read_ports(list(ports))
+
+    def call_later(self, delay: float, callback: Callable[[], None]) -> Timer:
+        return self._timers.call_later(delay, callback)
+
+    def read_ports_fire_and_forget(self, ports: list[ParadoxPort]) -> None:
+        task = asyncio.create_task(self._read_ports(ports))
+        self._read_ports_tasks.add(task)
+        task.add_done_callback(self._read_ports_tasks.discard)
+
+    async def _read_ports(self, ports: list[ParadoxPort]) -> None:
+        try:
+            await core_main.read_ports(ports)
+        except Exception as e:
+            self.error("failed to read ports: %s", e, exc_info=True)
+
+    def dump_change_trace(self) -> list[dict[str, Any]]:
+        if not self._change_trace:
+            return []
+
+        return self._change_trace.dump()
+
+    def add_port_subscriptions(self, port: ParadoxPort, keys: Iterable[PropertyKey]) -> None:
+        for key in keys:
+            self._port_subscriptions.setdefault(key, []).append(port)
+
+    def remove_port_subscriptions(self, port: ParadoxPort) -> None:
+        for key, ports in list(self._port_subscriptions.items()):
+            if port in ports:
+                ports.remove(port)
+            if not ports:
+                self._port_subscriptions.pop(key)
 
-        if update_ports:
-            await core_main.read_ports(self.get_ports())
+    def get_subscribed_ports(self, type_: str, id_: int | None, name: str) -> list[ParadoxPort]:
+        # Ports may subscribe to a specific property, to all properties of an entity or to a property of all entities
+        # of a type; a dict is used to keep ports unique while preserving their order
+        ports = {}
+        for key in ((type_, id_, name), (type_, id_, None), (type_, None, name)):
+            for port in self._port_subscriptions.get(key, ()):
+                ports[port] = True
 
-    def get_property(self, type_: str, id_: str | int | None, name: str) -> Property | None:
-        if type_ == "system":
-            return self._properties.get(type_, {}).get(name)
+        return list(ports)
+
+    @staticmethod
+    def _update_ordered_set(ordered_set: dict[int, None], item: int, present: bool) -> None:
+        if present:
+            ordered_set.setdefault(item)  # an item already present keeps its position
         else:
-            return self._properties.get(type_, {}).get(id_, {}).get(name)
+            ordered_set.pop(item, None)
+
+    def get_now_alarm_zone(self) -> int:
+        return next(iter(self._alarm_zones), 0)
+
+    def get_was_alarm_zone(self) -> int:
+        return next(iter(self._was_alarm_zones), 0)
+
+    def get_trouble_count(self, type_: str, id_: int | None) -> int:
+        return self._store.get_trouble_count(type_, id_)
 
-    def get_properties(self, type_: str, id_: str | int | None) -> dict[str, Property]:
-        if type_ == "system":
-            return self._properties.get(type_, {})
+    def get_property(self, type_: str, id_: int | None, name: str) -> Property | None:
+        return self._store.get(type_, id_, name)
+
+    def get_property_cell(self, type_: str, id_: int | None, name: str) -> PropertyCell:
+        return self._store.get_cell(type_, id_, name)
+
+    def get_trouble_cell(self, type_: str, id_: int | None) -> PropertyCell:
+        return self._store.get_trouble_cell(type_, id_)
+
+    def get_properties(self, type_: str, id_: int | None) -> dict[str, Property]:
+        return self._store.get_all(type_, id_)
+
+    def get_state_snapshot(self) -> StateSnapshot:
+        # Snapshot of the last flushed batch of changes
+        return self._store.get_snapshot()
+
+    def get_state(self, since_version: int | None = None) -> dict[str, Any]:
+        # Return the properties of all entities or, if a version is given, only of the entities changed after it, along
+        # with the version of the last flushed batch of changes, to be passed on the next call
+        snapshot = self._store.get_snapshot()
+        if since_version is None:
+            entities = snapshot.dump()
         else:
-            return self._properties.get(type_, {}).get(id_, {})
+            entities = snapshot.get_changes(since_version)
 
-    async def _update_properties(self) -> None:
-        changes = []
+        return {"version": snapshot.version, "entities": entities}
 
-        for type_, properties in self._properties.items():
-            type_info = self._paradox.storage.data.get(type_)
-            if type_info is None:
+    async def _update_properties(self) -> None:
+        # Storage entries are normally kept in sync by change events; entries loaded in bulk, which come without change
+        # events, are marked dirty and revisited on the next call, while a full sweep only serves as a rare consistency
+        # check
+        if self._dirty_entries:
+            await self._update_dirty_properties()
+
+        if time.monotonic() - self._last_properties_sweep_time >= self._properties_sweep_interval:
+            await self._sweep_properties()
+
+            # Snapshots are saved (and the journal is synced) along with sweeps, to keep disk writes rare
+            if self._snapshot_file and self._snapshot_dirty:
+                await self.save_snapshot()
+            if self._journal:
+                await self.flush_journal()
+
+    async def _sweep_properties(self) -> None:
+        start_time = time.perf_counter()
+        self._last_properties_sweep_time = time.monotonic()
+
+        count = 0
+        for type_ in list(self._store.get_types()):
+            for info in list(self._paradox.storage.data.get(type_, {}).values()):
+                count += await self._update_entry_properties(type_, info, cached_only=True)
+
+        duration = time.perf_counter() - start_time
+        self._metrics.histogram(metrics.SWEEP_TIME).observe(duration)
+        self._metrics.histogram(metrics.SWEEP_DIFFERENCES, metrics.SIZE_BUCKETS).observe(count)
+        self.debug("properties sweep took %.2f ms and found %d differences", duration * 1000, count)
+
+    async def _update_dirty_properties(self) -> None:
+        dirty_entries = self._dirty_entries
+        self._dirty_entries = set()
+
+        for type_, key in dirty_entries:
+            info = self._paradox.storage.data.get(type_, {}).get(key)
+            if info is None:
+                continue  # dropped from storage meanwhile (e.g. not among the enabled entities)
+
+            await self._update_entry_properties(type_, info, cached_only=False)
+
+    async def _update_entry_properties(self, type_: str, info: dict[str, Any], cached_only: bool) -> int:
+        properties = self._store.get_all(type_, info.get("id"))
+        names = properties.keys() if cached_only else info.keys() - {"id", "key"}
+        count = 0
+        for name in list(names):
+            if name not in info:
                 continue
-            if isinstance(next(iter(self._properties[type_].values())), dict):  # properties with id
-                for id_, props in properties.items():
-                    id_info = type_info.get(id_)
-                    if id_info is None:
-                        continue
-                    for prop, old_value in props.items():
-                        new_value = id_info[prop]
-                        if old_value != new_value:
-                            changes.append(
-                                SimpleNamespace(
-                                    type=type_,
-                                    key=id_,
-                                    property=prop,
-                                    old_value=old_value,
-                                    new_value=new_value,
-                                )
-                            )
+
+            old_value = properties.get(name)
+            new_value = info[name]
+            if old_value == new_value:
+                if self._stale_properties:
+                    self._confirm_property(type_, info.get("id"), name)
             else:
-                # Flatten properties without id
-                new_properties = {}
-                for props in type_info.values():
-                    new_properties.update(props)
-
-                for prop, old_value in properties.items():
-                    new_value = new_properties.get(prop)
-                    if new_value is None:
-                        continue
-                    if old_value != new_value:
-                        changes.append(
-                            SimpleNamespace(
-                                type=type_,
-                                key=None,
-                                property=prop,
-                                old_value=old_value,
-                                new_value=new_value,
-                            )
-                        )
-
-            for change in changes:
-                await self.handle_paradox_property_change(change, update_ports=False)
+                await self._apply_property_change(type_, info, name, old_value, new_value)
+                count += 1
+
+        return count
 
     def get_areas(self) -> Iterator[int]:
         return iter(self._areas)
@@ -382,16 +997,72 @@ class ParadoxAlarm(Peripheral):
         return MappingProxyType(self._remote_buttons)
 
     async def set_area_armed_mode(self, area: int, armed_mode: str) -> None:
-        self.debug("area %s: set armed mode to %s", area, armed_mode)
-        if not await self._paradox.panel.control_partitions([area], armed_mode):
+        await self.set_areas_armed_mode([area], armed_mode)
+
+    async def set_areas_armed_mode(self, areas: list[int], armed_mode: str) -> None:
+        self.debug("areas %s: set armed mode to %s", areas, armed_mode)
+        if not await self._commands.submit(commands.KIND_PARTITION, areas, armed_mode):
             raise exceptions.ParadoxCommandError("Failed to set area armed mode")
 
     async def set_zone_bypass(self, zone: int, bypass: bool) -> None:
-        self.debug("zone %s: %s bypass", zone, ["clear", "set"][bypass])
-        if not await self._paradox.panel.control_zones([zone], constants.ZONE_BYPASS_MAPPING[bypass]):
+        await self.set_zones_bypass([zone], bypass)
+
+    async def set_zones_bypass(self, zones: list[int], bypass: bool) -> None:
+        self.debug("zones %s: %s bypass", zones, ["clear", "set"][bypass])
+        if not await self._commands.submit(commands.KIND_ZONE, zones, constants.ZONE_BYPASS_MAPPING[bypass]):
             raise exceptions.ParadoxCommandError("Failed to set zone bypass")
 
     async def set_output_action(self, output: int, action: str) -> None:
-        self.debug("output %s: set action to %s", output, action)
-        if not await self._paradox.panel.control_outputs([output], action):
+        await self.set_outputs_action([output], action)
+
+    async def set_outputs_action(self, outputs: list[int], action: str) -> None:
+        self.debug("outputs %s: set action to %s", outputs, action)
+        if not await self._commands.submit(commands.KIND_PGM, outputs, action):
             raise exceptions.ParadoxCommandError("Failed to set output action")
+
+    def set_output_action_fire_and_forget(self, output: int, action: str) -> None:
+        task = asyncio.create_task(self._set_output_action(output, action))
+        self._command_tasks.add(task)
+        task.add_done_callback(self._command_tasks.discard)
+
+    async def _set_output_action(self, output: int, action: str) -> None:
+        try:
+            await self.set_output_action(output, action)
+        except Exception as e:
+            self.error("failed to set output %s action to %s: %s", output, action, e)
+
+    def get_command_queue_stats(self) -> dict[str, Any]:
+        return self._command_scheduler.get_stats()
+
+    async def _send_command(self, kind: str, ids: list[int], action: str) -> bool:
+        if not self._paradox:
+            raise exceptions.ParadoxCommandError("Not connected to panel")
+
+        routing.enter(self)  # commands are sent from the command scheduler's own task
+
+        panel = self._paradox.panel
+        match kind:
+            case commands.KIND_PARTITION:
+                control = panel.control_partitions
+            case commands.KIND_ZONE:
+                control = panel.control_zones
+            case commands.KIND_PGM:
+                control = panel.control_outputs
+            case _:
+                raise exceptions.ParadoxCommandError(f"Unknown command kind {kind}")
+
+        start_time = time.perf_counter()
+        result = False
+        try:
+            result = await control(ids, action)
+        finally:
+            # Timed out commands are cancelled, and counted as failed as well
+            self._metrics.histogram(metrics.COMMAND_TIME, kind=kind).observe(time.perf_counter() - start_time)
+            if not result:
+                self._metrics.counter(metrics.COMMAND_FAILURES, kind=kind).inc()
+
+        if result and kind == commands.KIND_PGM:
+            # Panels report PGM changes through status only, not through events; have the next status update come now
+            self._paradox.request_status_refresh()
+
+        return result
@@ -1,18 +1,103 @@
 import abc
 
+from collections.abc import Iterable
 from typing import cast
 
+from qtoggleserver.core import ports as core_ports
+from qtoggleserver.core.typing import Attribute, NullablePortValue
 from qtoggleserver.peripherals import PeripheralPort
+from qtoggleserver.utils import asyncio as asyncio_utils
 
 from .paradoxalarm import ParadoxAlarm
-from .typing import Property
+from .typing import Property, PropertyKey
 
 
 class ParadoxPort(PeripheralPort, metaclass=abc.ABCMeta):
+    # Whether reads are skipped for as long as the inputs of the port value are unchanged; ports whose value depends on
+    # anything else than their properties and own state (e.g. time) should disable it
+    SKIP_UNCHANGED_READS: bool = True
+
+    ADDITIONAL_ATTRDEFS = {
+        "stale": {
+            "display_name": "Stale",
+            "description": "Indicates that the value comes from a snapshot and is yet to be confirmed by the panel.",
+            "type": "boolean",
+            "modifiable": False,
+        }
+    }
+
+    def __init__(self, *args, **kwargs) -> None:
+        # The inputs version is bumped whenever the port value may have changed; reads are skipped while it equals the
+        # version of the last read
+        self._inputs_version: int = 1
+        self._read_inputs_version: int = 0
+
+        super().__init__(*args, **kwargs)
+
+        self._property_keys: list[PropertyKey] = list(self.get_property_keys())
+        self.get_peripheral().add_port_subscriptions(self, self._property_keys)
+        self._stale: bool = self.is_stale()
+
+    async def cleanup(self) -> None:
+        await super().cleanup()
+
+        self.get_peripheral().remove_port_subscriptions(self)
+
+    def get_property_keys(self) -> Iterable[PropertyKey]:
+        # Return `(type, id, property)` keys of the properties this port depends on; `None` acts as wildcard for `id`
+        # and `property`
+        return []
+
+    def is_stale(self) -> bool:
+        # Tells whether the port value still relies on properties restored from a snapshot
+        peripheral = self.get_peripheral()
+        return any(peripheral.is_property_stale(*key) for key in self._property_keys)
+
+    def update_stale(self) -> None:
+        # Called as properties of the port get confirmed by the panel; the `stale` attribute clears once all of them are
+        if self._stale and not self.is_stale():
+            self._stale = False
+            self.invalidate_attr("stale")
+            asyncio_utils.fire_and_forget(self.trigger_update())
+
+    async def attr_get_stale(self) -> bool:
+        return self._stale
+
     def on_property_change(
         self, type_: str, id_: str | None, property_: str, old_value: Property, new_value: Property
     ) -> None:
         pass
 
+    def invalidate_value(self) -> None:
+        # Have the value read again, as its inputs changed; called for changes of subscribed properties, while ports
+        # should call it themselves when their own state changes
+        self._inputs_version += 1
+
+    def push_value(self) -> None:
+        # Have the value read right away, rather than on the next change or update round
+        self.invalidate_value()
+        self.get_peripheral().read_ports_fire_and_forget([self])
+
+    async def read_transformed_value(self) -> NullablePortValue:
+        # Skipping the read spares qToggle core reading, transforming and comparing an unchanged value on every update
+        if self.SKIP_UNCHANGED_READS and self._read_inputs_version == self._inputs_version:
+            raise core_ports.SkipRead()
+
+        inputs_version = self._inputs_version
+        value = await super().read_transformed_value()
+        self._read_inputs_version = inputs_version
+
+        return value
+
+    async def set_attr(self, name: str, value: Attribute) -> None:
+        await super().set_attr(name, value)
+
+        self.invalidate_value()  # e.g. a new read transform
+
+    async def handle_enable(self) -> None:
+        await super().handle_enable()
+
+        self.invalidate_value()
+
     def get_peripheral(self) -> ParadoxAlarm:
         return cast(ParadoxAlarm, super().get_peripheral())
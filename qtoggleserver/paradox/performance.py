@@ -0,0 +1,154 @@
+from abc import ABCMeta
+
+from qtoggleserver.core.typing import NullablePortValue
+
+from . import link, metrics
+from .paradoxport import ParadoxPort
+
+
+class PerformancePort(ParadoxPort, metaclass=ABCMeta):
+    TYPE = "number"
+    WRITABLE = False
+    SKIP_UNCHANGED_READS = False  # values change with time
+
+    def make_id(self) -> str:
+        return f"performance.{self.ID}"
+
+    def get_metrics(self) -> metrics.Metrics:
+        return self.get_peripheral().get_metrics()
+
+    def get_recent_sum(self, name: str) -> float:
+        return sum(counter.recent.get_stats()[1] for counter in self.get_metrics().get_counters(name))
+
+    def get_recent_average(self, name: str) -> float:
+        # Averages over all label combinations (e.g. command kinds) of a histogram
+        count = 0
+        sum_ = 0
+        for histogram in self.get_metrics().get_histograms(name):
+            c, s, _ = histogram.recent.get_stats()
+            count += c
+            sum_ += s
+
+        return sum_ / count if count else 0
+
+    def get_last(self, name: str) -> float:
+        histograms = self.get_metrics().get_histograms(name)
+        if not histograms or histograms[0].last is None:
+            return 0
+
+        return histograms[0].last
+
+
+class ChangeRatePort(PerformancePort):
+    DISPLAY_NAME = "Property Change Rate"
+    UNIT = "changes/s"
+
+    ID = "change_rate"
+
+    async def read_value(self) -> NullablePortValue:
+        return round(sum(c.get_rate() for c in self.get_metrics().get_counters(metrics.PROPERTY_CHANGES)), 2)
+
+
+class DispatchTimePort(PerformancePort):
+    DISPLAY_NAME = "Change Dispatch Time"
+    UNIT = "ms"
+
+    ID = "dispatch_time"
+
+    async def read_value(self) -> NullablePortValue:
+        return round(self.get_recent_average(metrics.CHANGE_DISPATCH_TIME) * 1000, 3)
+
+
+class ReadFanoutPort(PerformancePort):
+    DISPLAY_NAME = "Ports Read Per Flush"
+
+    ID = "read_fanout"
+
+    async def read_value(self) -> NullablePortValue:
+        return round(self.get_recent_average(metrics.READ_PORTS_FANOUT), 1)
+
+
+class CommandTimePort(PerformancePort):
+    DISPLAY_NAME = "Command Round Trip Time"
+    UNIT = "ms"
+
+    ID = "command_time"
+
+    async def read_value(self) -> NullablePortValue:
+        return round(self.get_recent_average(metrics.COMMAND_TIME) * 1000, 1)
+
+
+class ReconnectCountPort(PerformancePort):
+    DISPLAY_NAME = "Panel Connections"
+
+    ID = "reconnect_count"
+
+    async def read_value(self) -> NullablePortValue:
+        return sum(c.value for c in self.get_metrics().get_counters(metrics.CONNECTS))
+
+
+class ConnectTimePort(PerformancePort):
+    DISPLAY_NAME = "Last Connect Time"
+    UNIT = "s"
+
+    ID = "connect_time"
+
+    async def read_value(self) -> NullablePortValue:
+        return round(self.get_last(metrics.CONNECT_TIME), 2)
+
+
+class SweepTimePort(PerformancePort):
+    DISPLAY_NAME = "Last Sweep Time"
+    UNIT = "ms"
+
+    ID = "sweep_time"
+
+    async def read_value(self) -> NullablePortValue:
+        return round(self.get_last(metrics.SWEEP_TIME) * 1000, 2)
+
+
+class SweepDifferencesPort(PerformancePort):
+    DISPLAY_NAME = "Last Sweep Differences"
+
+    ID = "sweep_differences"
+
+    async def read_value(self) -> NullablePortValue:
+        return self.get_last(metrics.SWEEP_DIFFERENCES)
+
+
+class LinkRoundTripPort(PerformancePort):
+    DISPLAY_NAME = "Link Round Trip Time"
+    UNIT = "ms"
+
+    ID = "link_round_trip"
+
+    async def read_value(self) -> NullablePortValue:
+        return round(self.get_recent_average(metrics.LINK_ROUND_TRIP) * 1000, 1)
+
+
+class LinkErrorRatePort(PerformancePort):
+    DISPLAY_NAME = "Link Frame Error Rate"
+    UNIT = "%"
+
+    ID = "link_error_rate"
+
+    async def read_value(self) -> NullablePortValue:
+        # Frames that were corrupted (estimated from discarded bytes) or missing, out of all frames expected recently
+        received_frames = self.get_recent_sum(metrics.LINK_RECEIVED_FRAMES)
+        corrupted_frames = self.get_recent_sum(metrics.LINK_DISCARDED_BYTES) / link.FRAME_SIZE
+        missed_frames = self.get_recent_sum(metrics.LINK_MISSED_REPLIES)
+        erroneous_frames = corrupted_frames + missed_frames
+        if not erroneous_frames:
+            return 0
+
+        return round(erroneous_frames / (received_frames + erroneous_frames) * 100, 2)
+
+
+class ArmingConfirmTimePort(PerformancePort):
+    DISPLAY_NAME = "Arming Confirm Time"
+    UNIT = "s"
+
+    ID = "arming_confirm_time"
+
+    async def read_value(self) -> NullablePortValue:
+        return round(self.get_recent_average(metrics.ARMING_CONFIRM_TIME), 2)
@@ -1,11 +1,12 @@
-import time
-
 from abc import ABCMeta
+from collections.abc import Iterable
 
 from qtoggleserver.core.typing import NullablePortValue
 
 from .paradoxport import ParadoxPort
-from .typing import Property
+from .store import PropertyCell
+from .timers import Timer
+from .typing import Property, PropertyKey
 
 
 class RemotePort(ParadoxPort, metaclass=ABCMeta):
@@ -20,6 +21,9 @@ class RemotePort(ParadoxPort, metaclass=ABCMeta):
     def get_remote_label(self) -> str:
         return self.get_property("label") or f"Remote {self.remote}"
 
+    def get_property_cell(self, name: str) -> PropertyCell:
+        return self.get_peripheral().get_property_cell("user", self.remote, name)
+
     def get_property(self, name: str) -> Property:
         return self.get_peripheral().get_property("user", self.remote, name)
 
@@ -27,7 +31,7 @@ class RemotePort(ParadoxPort, metaclass=ABCMeta):
         return self.get_peripheral().get_properties("user", self.remote)
 
 
-class RemoteButtonPort(RemotePort):
+class BaseButtonPort(RemotePort, metaclass=ABCMeta):
     TYPE = "boolean"
     WRITABLE = False
 
@@ -36,67 +40,75 @@ class RemoteButtonPort(RemotePort):
     def __init__(self, button: str, timeout: int, *args, **kwargs) -> None:
         self.button: str = button
         self.timeout: int = timeout
-        self.last_button_value: int = 0
-        self.change_timestamp: int = 0
+
+        self._pressed: bool = False
+        self._expiry_timer: Timer | None = None
 
         super().__init__(*args, **kwargs)
 
-    def make_id(self) -> str:
-        return f"{super().make_id()}_{self.button}"
+    def press(self) -> None:
+        # Stay pressed for `timeout` milliseconds after the last press, then push the release to this port only
+        self._pressed = True
+        self.invalidate_value()
+        if self._expiry_timer:
+            self._expiry_timer.cancel()
+        self._expiry_timer = self.get_peripheral().call_later(self.timeout / 1000, self._release)
 
-    async def attr_get_default_display_name(self) -> str:
-        return f"{super().get_remote_label()} Button {self.button.upper()}"
+    def _release(self) -> None:
+        self.debug("button released")
+        self._pressed = False
+        self._expiry_timer = None
+        self.push_value()
 
     async def read_value(self) -> NullablePortValue:
-        now = int(time.time() * 1000)
-        value = self.get_button_value()
-        if value and value != self.last_button_value:
-            self.debug("button value changed from %s to %s", self.last_button_value, value)
-            self.last_button_value = value
-            self.change_timestamp = now
+        return self._pressed
 
-        return now - self.change_timestamp <= self.timeout
 
-    def get_button_value(self) -> int:
-        return self.get_property(f"button_{self.button}") or 0
+class RemoteButtonPort(BaseButtonPort):
+    def __init__(self, *args, **kwargs) -> None:
+        self.last_button_value: int = 0
 
+        super().__init__(*args, **kwargs)
 
-class AnyRemoteButtonPort(RemotePort):
-    TYPE = "boolean"
-    WRITABLE = False
+    def make_id(self) -> str:
+        return f"{super().make_id()}_{self.button}"
 
-    ID = "button"
+    def get_property_keys(self) -> Iterable[PropertyKey]:
+        return [("user", self.remote, f"button_{self.button}")]
+
+    async def attr_get_default_display_name(self) -> str:
+        return f"{super().get_remote_label()} Button {self.button.upper()}"
 
-    def __init__(self, remotes: list[int], button: str, timeout: int, *args, **kwargs) -> None:
+    def on_property_change(
+        self, type_: str, id_: str | None, property_: str, old_value: Property, new_value: Property
+    ) -> None:
+        if new_value and new_value != self.last_button_value:
+            self.debug("button value changed from %s to %s", self.last_button_value, new_value)
+            self.last_button_value = new_value
+            self.press()
+
+
+class AnyRemoteButtonPort(BaseButtonPort):
+    def __init__(self, remotes: list[int], *args, **kwargs) -> None:
         self.remotes: list[int] = remotes
-        self.button: str = button
-        self.timeout: int = timeout
         self.last_button_values: dict[int, int] = {}
-        self.change_timestamps: dict[int, int] = {}
 
-        super().__init__(0, *args, **kwargs)
+        super().__init__(*args, remote=0, **kwargs)
 
     def make_id(self) -> str:
         return f"remote.{self.ID}_{self.button}"
 
+    def get_property_keys(self) -> Iterable[PropertyKey]:
+        return [("user", remote, f"button_{self.button}") for remote in self.remotes]
+
     async def attr_get_default_display_name(self) -> str:
         return f"Remote Button {self.button.upper()}"
 
-    async def read_value(self) -> NullablePortValue:
-        now = int(time.time() * 1000)
-        for remote in self.remotes:
-            value = self.get_button_value(remote)
-            last_value = self.last_button_values.get(remote, 0)
-            if value and value != last_value:
-                self.debug("button value changed from %s to %s on remote %s", last_value, value, remote)
-                self.last_button_values[remote] = value
-                self.change_timestamps[remote] = now
-
-        for remote in self.remotes:
-            if now - self.change_timestamps.get(remote, 0) <= self.timeout:
-                return True
-
-        return False
-
-    def get_button_value(self, remote: int) -> int:
-        return self.get_peripheral().get_property("user", remote, f"button_{self.button}")
+    def on_property_change(
+        self, type_: str, id_: str | None, property_: str, old_value: Property, new_value: Property
+    ) -> None:
+        last_value = self.last_button_values.get(id_, 0)
+        if new_value and new_value != last_value:
+            self.debug("button value changed from %s to %s on remote %s", last_value, new_value, id_)
+            self.last_button_values[id_] = new_value
+            self.press()
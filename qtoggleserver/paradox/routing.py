@@ -0,0 +1,134 @@
+import asyncio
+import contextvars
+import logging
+
+from collections.abc import Callable, Coroutine
+from typing import TYPE_CHECKING, Any
+
+
+if TYPE_CHECKING:
+    from paradox.paradox import Paradox
+
+    from .paradoxalarm import ParadoxAlarm
+
+
+# PAI delivers its messages through a process-wide pub/sub and reads its settings from a process-wide config object. To
+# drive several panels from one process, the alarm on whose behalf code runs is kept in a context variable. It is set
+# for each alarm's own tasks and is inherited by every task and callback that PAI schedules from within them, including
+# the handling of data received from the panel and the delivery of pub/sub messages.
+_current_alarm: contextvars.ContextVar[ParadoxAlarm | None] = contextvars.ContextVar("current_alarm", default=None)
+
+_alarms: dict[ParadoxAlarm, None] = {}  # ordered set of registered alarms
+_paradox_listeners: dict[Paradox, list[tuple[str, Callable[..., Any]]]] = {}
+
+# PAI pub/sub topics that each `Paradox` instance subscribes to, along with its handlers
+_PARADOX_TOPICS = {
+    "labels_loaded": "_on_labels_load",
+    "definitons_loaded": "_on_definitions_load",
+    "status_update": "_on_status_update",
+    "events": "_on_event",
+    "changes": "_on_property_change",
+}
+
+# Topics through which PAI loads storage entries in bulk, without publishing changes; the alarm is told about the
+# loaded entries once PAI has handled them
+_LOAD_TOPICS = {"labels_loaded", "definitons_loaded"}
+
+logger = logging.getLogger(__name__)
+
+
+def get_current_alarm() -> ParadoxAlarm | None:
+    return _current_alarm.get()
+
+
+def enter(alarm: ParadoxAlarm) -> None:
+    # Should only be called from tasks owned by the alarm, as it binds the current context to it
+    _current_alarm.set(alarm)
+
+
+def create_task(alarm: ParadoxAlarm, coro: Coroutine[Any, Any, Any]) -> asyncio.Task:
+    context = contextvars.copy_context()
+    context.run(_current_alarm.set, alarm)
+
+    return asyncio.create_task(coro, context=context)
+
+
+def register(alarm: ParadoxAlarm) -> None:
+    _alarms[alarm] = None
+
+
+def unregister(alarm: ParadoxAlarm) -> None:
+    _alarms.pop(alarm, None)
+
+
+def attach(alarm: ParadoxAlarm, paradox: Paradox) -> None:
+    # Restrict the pub/sub handlers of the given PAI instance to messages originating from the given alarm
+    from .pai import ps
+
+    listeners = []
+    for topic, handler_name in _PARADOX_TOPICS.items():
+        handler = getattr(paradox, handler_name, None)
+        topic_listeners = ps.pub.listeners[ps.PREFIX + topic]
+        for i, listener in enumerate(topic_listeners):
+            if handler is not None and listener.callback == handler:
+                scoped_handler = _make_scoped_handler(alarm, handler, notify_load=topic in _LOAD_TOPICS)
+                topic_listeners[i] = ps.Listener(scoped_handler, **listener.curriedArgs)
+                listeners.append((ps.PREFIX + topic, scoped_handler))
+                break
+
+    _paradox_listeners[paradox] = listeners
+
+    # Storage changes are published from within `update_container_object()`; binding the alarm while it runs ensures
+    # that they are attributed correctly, regardless of what triggered the update
+    update_container_object = paradox.storage.update_container_object
+
+    def scoped_update_container_object(*args, **kwargs) -> Any:
+        token = _current_alarm.set(alarm)
+        try:
+            return update_container_object(*args, **kwargs)
+        finally:
+            _current_alarm.reset(token)
+
+    paradox.storage.update_container_object = scoped_update_container_object
+
+
+def detach(paradox: Paradox) -> None:
+    from .pai import ps
+
+    for topic_name, handler in _paradox_listeners.pop(paradox, []):
+        try:
+            ps.pub.unsubscribe(handler, topic_name)
+        except ValueError:
+            pass
+
+
+def _make_scoped_handler(
+    alarm: ParadoxAlarm, handler: Callable[..., Any], notify_load: bool = False
+) -> Callable[..., Any]:
+    def scoped_handler(**kwargs) -> Any:
+        current_alarm = _current_alarm.get()
+        if current_alarm is not None and current_alarm is not alarm:
+            return None
+
+        result = handler(**kwargs)
+        if notify_load:
+            alarm.handle_paradox_storage_load(kwargs["data"])
+
+        return result
+
+    return scoped_handler
+
+
+async def dispatch_change(change: Any) -> None:
+    alarm = _current_alarm.get()
+    if alarm is None:
+        if len(_alarms) != 1:
+            logger.debug("ignoring change of unknown origin: %s", change)
+            return
+
+        # With a single alarm, there's no doubt about where the change comes from
+        alarm = next(iter(_alarms))
+    elif alarm not in _alarms:
+        return
+
+    await alarm.handle_paradox_property_change(change)
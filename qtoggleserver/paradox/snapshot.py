@@ -0,0 +1,50 @@
+import os
+
+from qtoggleserver.utils import json as json_utils
+
+from .typing import Property
+
+
+# Bump whenever the snapshot format changes; snapshots of other versions are ignored
+VERSION = 1
+
+
+type Snapshot = dict[str, dict[int, dict[str, Property]]]
+
+
+def load(path: str) -> Snapshot | None:
+    try:
+        with open(path) as f:
+            data = json_utils.loads(f.read(), extra_types=json_utils.ExtraTypes.EXTENDED)
+    except FileNotFoundError:
+        return None
+
+    if not isinstance(data, dict) or data.get("version") != VERSION:
+        return None
+
+    return {
+        type_: {int(id_): properties for id_, properties in entries.items()}
+        for type_, entries in data["properties"].items()
+    }
+
+
+def save(path: str, snapshot: Snapshot) -> None:
+    # Write to a temporary file first, so that an interrupted write never leaves a truncated snapshot behind
+    # Values such as the panel date and time are datetimes, hence the extended JSON encoding
+    data = json_utils.dumps(
+        {"version": VERSION, "properties": snapshot}, extra_types=json_utils.ExtraTypes.EXTENDED, separators=(",", ":")
+    )
+
+    temp_path = f"{path}.tmp"
+    try:
+        with open(temp_path, "w") as f:
+            f.write(data)
+
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except FileNotFoundError:
+            pass
+
+        raise
@@ -0,0 +1,296 @@
+from collections.abc import Iterable, Mapping
+from types import MappingProxyType
+
+from .typing import Property
+
+
+# Encoding of values in flag columns; unset slots read as `None`, just like slots set to `None`
+_FLAG_UNSET = 0
+_FLAG_FALSE = 1
+_FLAG_TRUE = 2
+_FLAG_NONE = 3
+_FLAG_VALUES = (None, False, True, None)
+_FLAG_ENCODINGS = {False: _FLAG_FALSE, True: _FLAG_TRUE, None: _FLAG_NONE}
+
+# Stands for properties that weren't set, where `None` is a valid value
+_UNSET = object()
+
+
+class PropertyTable:
+    # Properties of all entities of one type, stored column-wise. Entities are addressed by their numeric id (zone
+    # number, area number, etc.), which directly indexes each column; entities without id (i.e. system) use slot 0.
+    # Columns of boolean properties are packed into byte arrays, one byte per entity, and turned into lists should
+    # they ever get a value of another type. Other columns are lists, padded with `None`; the slots explicitly set to
+    # `None` are remembered aside, so that they aren't mistaken for unset ones. The number of active `*_trouble`
+    # properties of each entity is maintained as properties are set.
+
+    __slots__ = ("columns", "none_slots", "trouble_counts")
+
+    def __init__(self) -> None:
+        self.columns: dict[str, list[Property | None] | bytearray] = {}
+        self.none_slots: dict[str, set[int]] = {}
+        self.trouble_counts: list[int] = []
+
+    def get(self, id_: int | None, name: str) -> Property | None:
+        slot = id_ or 0
+        column = self.columns.get(name)
+        if column is None or slot >= len(column):
+            return None
+        if column.__class__ is bytearray:
+            return _FLAG_VALUES[column[slot]]
+
+        return column[slot]
+
+    def get_all(self, id_: int | None) -> dict[str, Property | None]:
+        slot = id_ or 0
+        properties = {}
+        for name, column in self.columns.items():
+            if slot >= len(column):
+                continue
+
+            if column.__class__ is bytearray:
+                flag = column[slot]
+                if flag:
+                    properties[name] = _FLAG_VALUES[flag]
+            else:
+                value = column[slot]
+                if value is not None or slot in self.none_slots.get(name, ()):
+                    properties[name] = value
+
+        return properties
+
+    def has(self, id_: int | None, name: str) -> bool:
+        slot = id_ or 0
+        column = self.columns.get(name)
+        if column is None or slot >= len(column):
+            return False
+        if column.__class__ is bytearray:
+            return column[slot] != _FLAG_UNSET
+
+        return column[slot] is not None or slot in self.none_slots.get(name, ())
+
+    def get_ids(self) -> list[int]:
+        # Returns the ids of entities having at least one property set
+        size = max((len(c) for c in self.columns.values()), default=0)
+        return [slot for slot in range(size) if self.get_all(slot)]
+
+    def get_trouble_count(self, id_: int | None) -> int:
+        slot = id_ or 0
+        if slot < len(self.trouble_counts):
+            return self.trouble_counts[slot]
+
+        return 0
+
+    def set(self, id_: int | None, name: str, value: Property | None) -> None:
+        slot = id_ or 0
+        if name.endswith("_trouble"):
+            delta = bool(value) - bool(self.get(id_, name))
+            if delta:
+                if slot >= len(self.trouble_counts):
+                    self.trouble_counts.extend([0] * (slot + 1 - len(self.trouble_counts)))
+                self.trouble_counts[slot] += delta
+
+        column = self.columns.get(name)
+        if column is None:
+            column = self.columns[name] = bytearray() if isinstance(value, bool) else []
+        elif column.__class__ is bytearray and not (value is None or isinstance(value, bool)):
+            none_slots = {s for s, flag in enumerate(column) if flag == _FLAG_NONE}
+            if none_slots:
+                self.none_slots[name] = none_slots
+            column = self.columns[name] = [_FLAG_VALUES[flag] for flag in column]
+
+        if column.__class__ is bytearray:
+            if slot >= len(column):
+                column.extend(bytes(slot + 1 - len(column)))
+            column[slot] = _FLAG_ENCODINGS[value]
+        else:
+            if slot >= len(column):
+                column.extend([None] * (slot + 1 - len(column)))
+            column[slot] = value
+
+            if value is None:
+                self.none_slots.setdefault(name, set()).add(slot)
+            elif name in self.none_slots:
+                self.none_slots[name].discard(slot)
+
+
+class PropertyCell:
+    # Holds the current value of one property, kept up to date by the store; readers hold on to the cell, so that
+    # reading the value takes a single attribute access
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: Property | None) -> None:
+        self.value: Property | None = value
+
+
+class StateSnapshot:
+    # Immutable view of all properties, as of a given version. Entities are addressed by their numeric id, entities
+    # without id (i.e. system) using id 0, and carry the version at which they last changed. Consecutive snapshots
+    # share the state of unchanged entities, so that taking a new snapshot only costs the changed entities, plus a
+    # shallow copy of the entity maps of their types.
+
+    __slots__ = ("_entities", "version")
+
+    def __init__(self, version: int, entities: dict[str, dict[int, tuple[int, Mapping[str, Property]]]]) -> None:
+        self.version: int = version
+        self._entities: dict[str, dict[int, tuple[int, Mapping[str, Property]]]] = entities
+
+    def get_types(self) -> Iterable[str]:
+        return self._entities.keys()
+
+    def get_ids(self, type_: str) -> Iterable[int]:
+        return self._entities.get(type_, {}).keys()
+
+    def get(self, type_: str, id_: int | None, name: str) -> Property | None:
+        return self.get_properties(type_, id_).get(name)
+
+    def get_properties(self, type_: str, id_: int | None) -> Mapping[str, Property]:
+        entity = self._entities.get(type_, {}).get(id_ or 0)
+        if entity is None:
+            return MappingProxyType({})
+
+        return entity[1]
+
+    def get_changes(self, since_version: int) -> dict[str, dict[int, Mapping[str, Property]]]:
+        # Return the properties of entities changed after the given version
+        changes = {}
+        for type_, entities in self._entities.items():
+            changed_entities = {id_: properties for id_, (v, properties) in entities.items() if v > since_version}
+            if changed_entities:
+                changes[type_] = changed_entities
+
+        return changes
+
+    def dump(self) -> dict[str, dict[int, Mapping[str, Property]]]:
+        return self.get_changes(0)
+
+
+class PropertyStore:
+    __slots__ = ("_cells", "_changed_entities", "_committed_entities", "_snapshot", "_tables", "_version")
+
+    def __init__(self) -> None:
+        self._tables: dict[str, PropertyTable] = {}
+        self._cells: dict[tuple[str, int, str | None], PropertyCell] = {}  # `None` name for trouble counts
+        self._version: int = 0
+        self._changed_entities: dict[tuple[str, int], None] = {}  # ordered set of entities changed since last commit
+        # Entities committed but not yet in `_snapshot`, along with their version and the committed values of their
+        # properties changed since, which belong to the next version
+        self._committed_entities: dict[tuple[str, int], tuple[int, dict[str, Property | None]]] = {}
+        self._snapshot: StateSnapshot = StateSnapshot(0, {})
+
+    def get_types(self) -> Iterable[str]:
+        return self._tables.keys()
+
+    def get(self, type_: str, id_: int | None, name: str) -> Property | None:
+        table = self._tables.get(type_)
+        if table is None:
+            return None
+
+        # Inlined `PropertyTable.get()`, as this is called on every property change and by ports not bound to cells
+        slot = id_ or 0
+        column = table.columns.get(name)
+        if column is None or slot >= len(column):
+            return None
+
+        if column.__class__ is bytearray:
+            return _FLAG_VALUES[column[slot]]
+
+        return column[slot]
+
+    def get_all(self, type_: str, id_: int | None) -> dict[str, Property | None]:
+        table = self._tables.get(type_)
+        if table is None:
+            return {}
+
+        return table.get_all(id_)
+
+    def dump(self) -> dict[str, dict[int, dict[str, Property]]]:
+        return {type_: {id_: table.get_all(id_) for id_ in table.get_ids()} for type_, table in self._tables.items()}
+
+    def get_trouble_count(self, type_: str, id_: int | None) -> int:
+        table = self._tables.get(type_)
+        if table is None:
+            return 0
+
+        return table.get_trouble_count(id_)
+
+    def set(self, type_: str, id_: int | None, name: str, value: Property | None) -> None:
+        table = self._tables.get(type_)
+        if table is None:
+            table = self._tables[type_] = PropertyTable()
+
+        slot = id_ or 0
+        if self._committed_entities:
+            committed = self._committed_entities.get((type_, slot))
+            if committed is not None and name not in committed[1]:
+                committed[1][name] = table.get(id_, name) if table.has(id_, name) else _UNSET
+
+        table.set(id_, name, value)
+        self._changed_entities[type_, slot] = None
+
+        if self._cells:
+            cell = self._cells.get((type_, slot, name))
+            if cell is not None:
+                cell.value = value
+            if name.endswith("_trouble"):
+                cell = self._cells.get((type_, slot, None))
+                if cell is not None:
+                    cell.value = table.get_trouble_count(id_)
+
+    def get_cell(self, type_: str, id_: int | None, name: str) -> PropertyCell:
+        key = type_, id_ or 0, name
+        cell = self._cells.get(key)
+        if cell is None:
+            cell = self._cells[key] = PropertyCell(self.get(type_, id_, name))
+
+        return cell
+
+    def get_trouble_cell(self, type_: str, id_: int | None) -> PropertyCell:
+        # Cell holding the number of active `*_trouble` properties of an entity
+        key = type_, id_ or 0, None
+        cell = self._cells.get(key)
+        if cell is None:
+            cell = self._cells[key] = PropertyCell(self.get_trouble_count(type_, id_))
+
+        return cell
+
+    def get_version(self) -> int:
+        return self._version
+
+    def commit(self) -> int:
+        # Close the current batch of changes, if any, under a new version
+        if self._changed_entities:
+            self._version += 1
+            for key in self._changed_entities:
+                self._committed_entities[key] = self._version, {}
+            self._changed_entities.clear()
+
+        return self._version
+
+    def get_snapshot(self) -> StateSnapshot:
+        # Snapshot of the last committed version; changes not yet committed are left out
+        if not self._committed_entities:
+            return self._snapshot
+
+        # Copy the maps of changed types only, and only rebuild the properties of changed entities
+        entities = dict(self._snapshot._entities)
+        copied_types = set()
+        for (type_, id_), (version, committed_values) in self._committed_entities.items():
+            if type_ not in copied_types:
+                entities[type_] = dict(entities.get(type_, {}))
+                copied_types.add(type_)
+
+            properties = self._tables[type_].get_all(id_)
+            for name, value in committed_values.items():
+                if value is _UNSET:
+                    properties.pop(name, None)
+                else:
+                    properties[name] = value
+
+            entities[type_][id_] = version, MappingProxyType(properties)
+
+        self._committed_entities.clear()
+        self._snapshot = StateSnapshot(self._version, entities)
+
+        return self._snapshot
@@ -1,15 +1,20 @@
 from abc import ABCMeta
+from collections.abc import Iterable
 
 from qtoggleserver.core.typing import NullablePortValue
 
 from .paradoxport import ParadoxPort
-from .typing import Property
+from .store import PropertyCell
+from .typing import Property, PropertyKey
 
 
 class SystemPort(ParadoxPort, metaclass=ABCMeta):
     def make_id(self) -> str:
         return f"system.{self.ID}"
 
+    def get_property_cell(self, name: str) -> PropertyCell:
+        return self.get_peripheral().get_property_cell("system", None, name)
+
     def get_property(self, name: str) -> Property:
         return self.get_peripheral().get_property("system", None, name)
 
@@ -24,5 +29,13 @@ class SystemTroublePort(SystemPort):
 
     ID = "trouble"
 
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+
+        self._trouble_cell: PropertyCell = self.get_property_cell("trouble")
+
+    def get_property_keys(self) -> Iterable[PropertyKey]:
+        return [("system", None, "trouble")]
+
     async def read_value(self) -> NullablePortValue:
-        return self.get_property("trouble")
+        return self._trouble_cell.value
@@ -0,0 +1,88 @@
+import asyncio
+import heapq
+import itertools
+import logging
+
+from collections.abc import Callable
+
+
+logger = logging.getLogger(__name__)
+
+
+class Timer:
+    __slots__ = ("callback", "cancelled", "when")
+
+    def __init__(self, when: float, callback: Callable[[], None]) -> None:
+        self.when: float = when
+        self.callback: Callable[[], None] = callback
+        self.cancelled: bool = False
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+
+class TimerScheduler:
+    # Keeps all timers in a heap and arms a single event loop timer for the earliest one, so that any number of
+    # pending timers costs one loop handle. Cancelled timers are simply skipped when they become due.
+
+    def __init__(self) -> None:
+        self._heap: list[tuple[float, int, Timer]] = []
+        self._counter: itertools.count = itertools.count()
+        self._handle: asyncio.TimerHandle | None = None
+        self._handle_when: float | None = None
+
+    def call_later(self, delay: float, callback: Callable[[], None]) -> Timer:
+        loop = asyncio.get_running_loop()
+        timer = Timer(loop.time() + delay, callback)
+        heapq.heappush(self._heap, (timer.when, next(self._counter), timer))
+        self._arm(loop)
+
+        return timer
+
+    def cancel_all(self) -> None:
+        for _, _, timer in self._heap:
+            timer.cancel()
+
+        self._heap.clear()
+        if self._handle:
+            self._handle.cancel()
+            self._handle = None
+            self._handle_when = None
+
+    def get_pending_count(self) -> int:
+        return sum(1 for _, _, timer in self._heap if not timer.cancelled)
+
+    def _arm(self, loop: asyncio.AbstractEventLoop) -> None:
+        while self._heap and self._heap[0][2].cancelled:
+            heapq.heappop(self._heap)
+
+        if not self._heap:
+            return
+
+        when = self._heap[0][0]
+        if self._handle_when is not None and self._handle_when <= when:
+            return  # already armed for an earlier (or the same) time
+
+        if self._handle:
+            self._handle.cancel()
+
+        self._handle = loop.call_at(when, self._run)
+        self._handle_when = when
+
+    def _run(self) -> None:
+        self._handle = None
+        self._handle_when = None
+
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        while self._heap and self._heap[0][0] <= now:
+            _, _, timer = heapq.heappop(self._heap)
+            if timer.cancelled:
+                continue
+
+            try:
+                timer.callback()
+            except Exception as e:
+                logger.error("timer callback failed: %s", e, exc_info=True)
+
+        self._arm(loop)
@@ -0,0 +1,50 @@
+import collections
+import time
+
+from typing import Any
+
+from qtoggleserver.utils import json as json_utils
+
+from .typing import Property
+
+
+class LazyJSON:
+    # Defers JSON dumping of a value until it is actually formatted (e.g. by an enabled log handler)
+
+    __slots__ = ("_value",)
+
+    def __init__(self, value: Any) -> None:
+        self._value: Any = value
+
+    def __str__(self) -> str:
+        return json_utils.dumps(self._value, extra_types=json_utils.ExtraTypes.EXTENDED)
+
+
+class ChangeTrace:
+    # Fixed-size, in-memory ring buffer of property change records
+
+    def __init__(self, size: int) -> None:
+        self._records: collections.deque[tuple[float, str, int | None, str, Property | None, Property | None]] = (
+            collections.deque(maxlen=size)
+        )
+
+    def record(
+        self, type_: str, id_: int | None, name: str, old_value: Property | None, new_value: Property | None
+    ) -> None:
+        self._records.append((time.time(), type_, id_, name, old_value, new_value))
+
+    def dump(self) -> list[dict[str, Any]]:
+        return [
+            {
+                "timestamp": timestamp,
+                "type": type_,
+                "id": id_,
+                "property": name,
+                "old_value": old_value,
+                "new_value": new_value,
+            }
+            for timestamp, type_, id_, name, old_value, new_value in self._records
+        ]
+
+    def clear(self) -> None:
+        self._records.clear()
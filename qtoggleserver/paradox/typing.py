@@ -1 +1,2 @@
 type Property = int | bool | str
+type PropertyKey = tuple[str, int | None, str | None]
@@ -1,9 +1,11 @@
 from abc import ABCMeta
+from collections.abc import Iterable
 
-from qtoggleserver.core.typing import NullablePortValue
+from qtoggleserver.core.typing import NullablePortValue, PortValue
 
 from .paradoxport import ParadoxPort
-from .typing import Property
+from .store import PropertyCell
+from .typing import Property, PropertyKey
 
 
 class ZonePort(ParadoxPort, metaclass=ABCMeta):
@@ -18,6 +20,9 @@ class ZonePort(ParadoxPort, metaclass=ABCMeta):
     def get_zone_label(self) -> str:
         return self.get_property("label") or f"Zone {self.zone}"
 
+    def get_property_cell(self, name: str) -> PropertyCell:
+        return self.get_peripheral().get_property_cell("zone", self.zone, name)
+
     def get_property(self, name: str) -> Property:
         return self.get_peripheral().get_property("zone", self.zone, name)
 
@@ -31,11 +36,19 @@ class ZoneOpenPort(ZonePort):
 
     ID = "open"
 
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+
+        self._open_cell: PropertyCell = self.get_property_cell("open")
+
+    def get_property_keys(self) -> Iterable[PropertyKey]:
+        return [("zone", self.zone, "open")]
+
     async def attr_get_default_display_name(self) -> str:
         return f"{self.get_zone_label()} Open"
 
     async def read_value(self) -> NullablePortValue:
-        return self.get_property("open")
+        return self._open_cell.value
 
 
 class ZoneAlarmPort(ZonePort):
@@ -44,11 +57,19 @@ class ZoneAlarmPort(ZonePort):
 
     ID = "alarm"
 
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+
+        self._alarm_cell: PropertyCell = self.get_property_cell("alarm")
+
+    def get_property_keys(self) -> Iterable[PropertyKey]:
+        return [("zone", self.zone, "alarm")]
+
     async def attr_get_default_display_name(self) -> str:
         return f"{self.get_zone_label()} Alarm"
 
     async def read_value(self) -> NullablePortValue:
-        return self.get_property("alarm")
+        return self._alarm_cell.value
 
 
 class ZoneWasInAlarmPort(ZonePort):
@@ -57,11 +78,19 @@ class ZoneWasInAlarmPort(ZonePort):
 
     ID = "was_in_alarm"
 
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+
+        self._was_in_alarm_cell: PropertyCell = self.get_property_cell("was_in_alarm")
+
+    def get_property_keys(self) -> Iterable[PropertyKey]:
+        return [("zone", self.zone, "was_in_alarm")]
+
     async def attr_get_default_display_name(self) -> str:
         return f"{self.get_zone_label()} Was In Alarm"
 
     async def read_value(self) -> NullablePortValue:
-        return self.get_property("was_in_alarm")
+        return self._was_in_alarm_cell.value
 
 
 class ZoneTroublePort(ZonePort):
@@ -70,15 +99,19 @@ class ZoneTroublePort(ZonePort):
 
     ID = "trouble"
 
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+
+        self._trouble_count_cell: PropertyCell = self.get_peripheral().get_trouble_cell("zone", self.zone)
+
+    def get_property_keys(self) -> Iterable[PropertyKey]:
+        return [("zone", self.zone, None)]
+
     async def attr_get_default_display_name(self) -> str:
         return f"{self.get_zone_label()} Trouble"
 
     async def read_value(self) -> NullablePortValue:
-        for name, value in self.get_properties().items():
-            if name.endswith("_trouble") and value:
-                return True
-
-        return False
+        return self._trouble_count_cell.value > 0
 
 
 class ZoneTamperPort(ZonePort):
@@ -87,8 +120,48 @@ class ZoneTamperPort(ZonePort):
 
     ID = "tamper"
 
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+
+        self._tamper_cell: PropertyCell = self.get_property_cell("tamper")
+
+    def get_property_keys(self) -> Iterable[PropertyKey]:
+        return [("zone", self.zone, "tamper")]
+
     async def attr_get_default_display_name(self) -> str:
         return f"{self.get_zone_label()} Tamper"
 
     async def read_value(self) -> NullablePortValue:
-        return self.get_property("tamper")
+        return self._tamper_cell.value
+
+
+class ZoneBypassPort(ZonePort):
+    TYPE = "boolean"
+    WRITABLE = True
+
+    ID = "bypass"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+
+        self._bypassed_cell: PropertyCell = self.get_property_cell("bypassed")
+
+    def get_property_keys(self) -> Iterable[PropertyKey]:
+        return [("zone", self.zone, "bypassed")]
+
+    async def attr_get_default_display_name(self) -> str:
+        return f"{self.get_zone_label()} Bypass"
+
+    async def read_value(self) -> NullablePortValue:
+        return self._bypassed_cell.value
+
+    async def write_value(self, value: PortValue) -> None:
+        # Some panels toggle the bypass whatever the requested action, so nothing is sent if already in requested state
+        if bool(self._bypassed_cell.value) == value:
+            return
+
+        try:
+            await self.get_peripheral().set_zone_bypass(self.zone, value)
+        except Exception:
+            self.push_value()
+            raise